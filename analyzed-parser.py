@@ -11,109 +11,282 @@ Behavior:
 - Writes one JSON file per input .txt into data/json_data/.
 """
 
+import argparse
 import json
 import os
 import re
+import sys
+from collections import deque, namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import groupby
+
+import build_manifest
+import identity_index
+import jsonl_shards
+import run_report
+from build_manifest import BuildManifest, bytes_digest, converter_digest, file_digest, manifest_key
+from identity_index import POLICIES, IdentityIndex, apply_renames, pattern_claims, pattern_key_for
+from jsonl_shards import DEFAULT_SHARD_SIZE, ShardWriter, decode_record, encode_record, remove_shards
+from run_report import Timed, graph_size, open_report
+
+# every repo module the output depends on; the build manifest is keyed on
+# all of them, so editing any one rebuilds (see converter_digest)
+CODE_PATHS = [os.path.abspath(__file__), identity_index.__file__, jsonl_shards.__file__,
+              build_manifest.__file__, run_report.__file__]
 
 # -------------------------
-# Helpers (mostly your original functions, slightly adapted)
+# Section lexer
 # -------------------------
-def clean_lines(text):
-    return [ln.strip() for ln in text.splitlines() if ln.strip()]
-
-def chunk_list_safe(lst, n):
-    for i in range(0, len(lst), n):
-        yield lst[i:i+n]
-
-HEADERS = [
-    "Identitas Pattern",
-    "Analisis Struktur Pattern",
-    "kelas (classes)",
-    "Properti relasional",
-    "Properti atributif",
-    "Penyesuaian AgentO"
-]
-
-def split_sections(text):
-    lines = clean_lines(text)
-    sections = {}
-    current = None
-    for ln in lines:
+# Section headings of the analyzed pattern text, mapped to the number of
+# table columns each section is laid out in (one cell per line).
+HEADERS = {
+    "Identitas Pattern": 2,
+    "Analisis Struktur Pattern": 5,
+    "kelas (classes)": 5,
+    "Properti relasional": 5,
+    "Properti atributif": 5,
+    "Penyesuaian AgentO": 4,
+}
+
+# index used for the event that opens a section (real rows count from 0)
+SECTION_START = -1
+
+# same boundaries as str.splitlines()
+LINE_BREAK = re.compile(r"\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+SectionRow = namedtuple("SectionRow", ["section", "index", "cells", "offsets"])
+
+def iter_lines(text):
+    """
+    Yield (offset, line) for every non-blank line, stripped.
+    offset is the position of the stripped line in text.
+    """
+    start = 0
+    end = len(text)
+    for m in LINE_BREAK.finditer(text):
+        ln = text[start:m.start()]
+        stripped = ln.strip()
+        if stripped:
+            yield start + len(ln) - len(ln.lstrip()), stripped
+        start = m.end()
+    if start < end:
+        ln = text[start:]
+        stripped = ln.strip()
+        if stripped:
+            yield start + len(ln) - len(ln.lstrip()), stripped
+
+def lex_sections(text):
+    """
+    Single pass over the analyzed text, yielding SectionRow events.
+    Every heading yields one event with index SECTION_START, followed by the
+    table rows of that section (cells grouped by the section's column count,
+    the last row padded with "" and offset None).
+    """
+    section = None
+    width = 0
+    index = 0
+    cells = []
+    offsets = []
+    for offset, ln in iter_lines(text):
         if ln in HEADERS:
-            current = ln
-            sections[current] = []
-        elif current:
-            sections[current].append(ln)
-    return sections
-
-def parse_two_column(lines):
-    # lines typically like: "Atribut", "Nilai", "Framework", "AutoGen", ...
-    if lines and lines[0].lower() in ("atribut", "attribute"):
-        lines = lines[2:]
+            if cells:
+                pad = width - len(cells)
+                yield SectionRow(section, index, tuple(cells) + ("",) * pad, tuple(offsets) + (None,) * pad)
+            section = ln
+            width = HEADERS[ln]
+            index = 0
+            cells = []
+            offsets = []
+            yield SectionRow(section, SECTION_START, (), (offset,))
+        elif section:
+            cells.append(ln)
+            offsets.append(offset)
+            if len(cells) == width:
+                yield SectionRow(section, index, tuple(cells), tuple(offsets))
+                index += 1
+                cells = []
+                offsets = []
+    if cells:
+        pad = width - len(cells)
+        yield SectionRow(section, index, tuple(cells) + ("",) * pad, tuple(offsets) + (None,) * pad)
+
+def section_counter():
+    # groupby key: bumps on every heading, so repeated headings start a new group
+    count = -1
+    def key(row):
+        nonlocal count
+        if row.index == SECTION_START:
+            count += 1
+        return count
+    return key
+
+# -------------------------
+# Records
+# -------------------------
+# Compact slotted records for the parsed tables. They answer .get()/[] like the
+# dicts they replace, so the normalizers read them unchanged.
+class Record:
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            setattr(self, name, value)
+        for name in self.__slots__[len(args):]:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} got unexpected fields {sorted(kwargs)}")
+
+    def get(self, key, default=None):
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+class SourceRef(Record):
+    """
+    (offset, length) reference into a pattern's source text.
+    Resolved on demand, from the given text or by re-reading path;
+    length None runs to the end of the text.
+    """
+    __slots__ = ("path", "offset", "length")
+
+    def resolve(self, text=None):
+        if text is None:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        end = None if self.length is None else self.offset + self.length
+        return text[self.offset:end]
+
+class EntityRecord(Record):
+    # raw_spans: one (offset, length) per table cell, offset None for padding cells
+    __slots__ = ("id", "vendorClass", "mapsTo", "attributes", "note", "raw_spans")
+
+    def raw_row(self, text):
+        return [text[o:o + n] if o is not None else "" for o, n in self.raw_spans or ()]
+
+class RelationalProperty(Record):
+    __slots__ = ("name", "domain", "range", "definition", "status_in_pattern")
+
+class NewClassTerm(Record):
+    __slots__ = ("name", "definition", "status_in_pattern")
+
+class PropertyTerm(Record):
+    __slots__ = ("name", "domain", "range", "justification")
+
+# -------------------------
+# Section row parsers
+# -------------------------
+def parse_two_column(rows):
+    # rows typically like: ("Atribut", "Nilai"), ("Framework", "AutoGen"), ...
     obj = {}
-    for p in chunk_list_safe(lines, 2):
-        if len(p) == 2:
-            obj[p[0]] = p[1]
-        elif len(p) == 1:
-            obj[p[0]] = ""
+    for row in rows:
+        key, value = row.cells
+        if row.index == 0 and key.lower() in ("atribut", "attribute"):
+            continue
+        obj[key] = value
     return obj
 
-def parse_entities(lines):
-    # lines are table rows; assume blocks of 5 (Entitas, Framework Class, Atribut, Contoh nilai, Catatan)
-    # If the input is shorter, gracefully fallback.
-    # If the first token is header-like skip it.
-    if lines and lines[0].lower().startswith("entitas"):
-        # skip header rows heuristically
-        # find index of next blank or actual data - but keep simple:
-        lines = lines[5:] if len(lines) > 5 else lines
+EXAMPLE_TOKEN = re.compile(r'[,"“”]')
 
-    entities = []
-    # chunk by 5 to extract ent, class, attrs, example, note
-    for chunk in chunk_list_safe(lines, 5):
-        while len(chunk) < 5:
-            chunk.append("")
-        ent, cls, attrs, example, note = chunk
-        ent = ent.strip()
-        cls = cls.strip()
-        attrs = attrs.strip()
-        example = example.strip()
-        note = note.strip()
-
-        # parse attributes and example values
-        attr_dict = {}
-        attr_names = [a.strip() for a in attrs.split(",")] if attrs else []
-        example_values = [e.strip() for e in re.split(r',\s*(?=(?:[^"]*"[^"]*")*[^"]*$)', example)] if example else []
-        # unquote example values
-        example_values = [v.strip().strip('"').strip("“”") for v in example_values]
-
-        for i, a in enumerate(attr_names):
-            if i < len(example_values):
-                attr_dict[a] = example_values[i]
-
-        entities.append({
-            "id": ent.lower().replace(" ", "_").strip() if ent else "",
-            "vendorClass": cls,
-            # mapsTo heuristic
-            "mapsTo": "agento:Agent" if "Agent" in cls or "agent" in cls.lower() else
-                      "agento:Task" if "Task" in cls else
-                      "agento:Workflow" if "Flow" in cls or "workflow" in cls.lower() else
-                      "",
-            "attributes": attr_dict,
-            "note": note,
-            "raw_row": chunk
-        })
+def split_example_values(example):
+    """
+    Split a "Contoh nilai" cell on the commas that sit outside quotes, in one pass.
+    Straight quotes behave like the former ',\\s*(?=(?:[^"]*"[^"]*")*[^"]*$)' split
+    (a comma splits when an even number of '"' follow it); commas inside curly
+    “...” quotes are kept as well.
+    """
+    values = []
+    # with an odd number of '"', the old lookahead split where the count before the comma was odd
+    inside = example.count('"') % 2 == 1
+    curly = 0
+    start = 0
+    for m in EXAMPLE_TOKEN.finditer(example):
+        ch = m.group()
+        if ch == ",":
+            if not inside and not curly:
+                values.append(example[start:m.start()].strip())
+                start = m.end()
+        elif ch == '"':
+            inside = not inside
+        elif not inside:
+            if ch == "“":
+                curly += 1
+            elif curly:
+                curly -= 1
+    values.append(example[start:].strip())
+    return values
+
+def maps_to_for_class(cls):
+    # mapsTo heuristic
+    return ("agento:Agent" if "Agent" in cls or "agent" in cls.lower() else
+            "agento:Task" if "Task" in cls else
+            "agento:Workflow" if "Flow" in cls or "workflow" in cls.lower() else
+            "")
+
+def parse_entity_row(row):
+    ent, cls, attrs, example, note = row.cells
+
+    # parse attributes and example values
+    attr_dict = {}
+    attr_names = [a.strip() for a in attrs.split(",")] if attrs else []
+    example_values = split_example_values(example) if example else []
+    # unquote example values
+    example_values = [v.strip().strip('"').strip("“”") for v in example_values]
+
+    for i, a in enumerate(attr_names):
+        if i < len(example_values):
+            attr_dict[a] = example_values[i]
+
+    return EntityRecord(
+        ent.lower().replace(" ", "_").strip() if ent else "",
+        cls,
+        maps_to_for_class(cls),
+        attr_dict,
+        note,
+        tuple((o, len(c)) for o, c in zip(row.offsets, row.cells))
+    )
 
+def parse_entities(rows):
+    # rows of 5 cells (Entitas, Framework Class, Atribut, Contoh nilai, Catatan).
+    # A leading header-like row is skipped, unless it is the only row.
+    entities = []
+    header = None
+    for row in rows:
+        if row.index == 0 and row.cells[0].lower().startswith("entitas"):
+            header = row
+            continue
+        header = None
+        entities.append(parse_entity_row(row))
+    if header:
+        entities.append(parse_entity_row(header))
     return entities
 
-def parse_relational(lines):
-    # lines likely contain the relational property table; parse in groups of 5 like before
-    if lines and lines[0].lower().startswith("property"):
-        lines = lines[5:]
+def parse_relational(rows):
+    # relational property table, rows of 5 cells
     props = []
-    for chunk in chunk_list_safe(lines, 5):
-        while len(chunk) < 5:
-            chunk.append("")
-        prop, domain_range, definisi, bukti, status = [c.strip() for c in chunk]
+    for row in rows:
+        if row.index == 0 and row.cells[0].lower().startswith("property"):
+            continue
+        prop, domain_range, definisi, bukti, status = row.cells
         if not prop:
             continue
         if "→" in domain_range:
@@ -125,84 +298,153 @@ def parse_relational(lines):
             if m:
                 domain, range_ = m.group(1), m.group(2)
         status_clean = status.lower().replace("disarankan", "suggested").replace("opsional", "optional")
-        props.append({
-            "name": prop,
-            "domain": domain,
-            "range": range_,
-            "definition": definisi,
-            "status_in_pattern": status_clean
-        })
+        props.append(RelationalProperty(prop, domain, range_, definisi, status_clean))
     return props
 
-def parse_penyesuaian(lines):
-    rows = list(chunk_list_safe(lines, 4))
+def parse_penyesuaian(rows):
     new_classes = []
     datatype_props = []
     optional_props = []
-    for r in rows:
-        while len(r) < 4:
-            r.append("")
-        jenis, nama, desc, just = [x.strip() for x in r]
+    for row in rows:
+        jenis, nama, desc, just = row.cells
         if not jenis:
             continue
         if "class" in jenis.lower():
-            new_classes.append({"name": nama, "definition": desc, "status_in_pattern": "used"})
+            new_classes.append(NewClassTerm(nama, desc, "used"))
         elif "datatype property" in jenis.lower() or "datatype" in jenis.lower():
-            datatype_props.append({"name": nama, "domain": "agento:Agent", "range": "xsd:string", "justification": just})
+            datatype_props.append(PropertyTerm(nama, "agento:Agent", "xsd:string", just))
         elif "opsional property" in jenis.lower() or "optional" in jenis.lower():
-            optional_props.append({"name": nama, "domain": "agento:Agent", "range":"xsd:string", "justification": just})
+            optional_props.append(PropertyTerm(nama, "agento:Agent", "xsd:string", just))
     return {"newClasses": new_classes, "datatypeProperties": datatype_props, "optionalProperties": optional_props}
 
 # -------------------------
 # Convert raw analyzed text -> intermediate structured "autogen" object
 # -------------------------
-def convert_pattern_to_autogen(text):
-    sections = split_sections(text)
+def convert_pattern_to_autogen(text, path=None):
     output = {}
 
-    if "Identitas Pattern" in sections:
-        ident = parse_two_column(sections["Identitas Pattern"])
-        output["framework"] = ident.get("Framework", "").strip()
-        output["file_name"] = ident.get("File name", "").strip()
-        output["pattern_type"] = ident.get("Pattern Type", "").strip()
-        output["description"] = ident.get("Deskripsi", "").strip()
+    # consume the lexer events section by section; rows are never materialized
+    for _, rows in groupby(lex_sections(text), key=section_counter()):
+        section = next(rows).section
 
-    if "Analisis Struktur Pattern" in sections:
-        output["entities"] = parse_entities(sections["Analisis Struktur Pattern"])
+        if section == "Identitas Pattern":
+            ident = parse_two_column(rows)
+            output["framework"] = ident.get("Framework", "").strip()
+            output["file_name"] = ident.get("File name", "").strip()
+            output["pattern_type"] = ident.get("Pattern Type", "").strip()
+            output["description"] = ident.get("Deskripsi", "").strip()
 
-    if "Properti relasional" in sections:
-        output["ontologyRelationalProperties"] = parse_relational(sections["Properti relasional"])
+        elif section == "Analisis Struktur Pattern":
+            output["entities"] = parse_entities(rows)
 
-    if "Penyesuaian AgentO" in sections:
-        output["newOntologyTerms"] = parse_penyesuaian(sections["Penyesuaian AgentO"])
+        elif section == "Properti relasional":
+            output["ontologyRelationalProperties"] = parse_relational(rows)
 
-    # keep original text to allow title extraction fallbacks
-    output["_raw_text"] = text
+        elif section == "Penyesuaian AgentO":
+            output["newOntologyTerms"] = parse_penyesuaian(rows)
+
+    # reference to the original text (for title extraction fallbacks), not a copy of it
+    output["_source"] = SourceRef(path, 0, len(text))
     return output
 
 # -------------------------
-# Framework detection (same logic, tolerant)
+# Framework registry & detection
 # -------------------------
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over (keyword, value) pairs.
+    matches(text) reports the value of every keyword occurrence in one pass
+    over text, overlapping ones included ("workflow" also hits "flow").
+    """
+
+    def __init__(self, keywords):
+        goto = [{}]
+        out = [[]]
+        for word, value in keywords:
+            node = 0
+            for ch in word:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto.append({})
+                    out.append([])
+                    goto[node][ch] = nxt
+                node = nxt
+            out[node].append(value)
+
+        # failure links, breadth first; outputs inherit their fallback's outputs
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                queue.append(child)
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] = out[child] + out[fail[child]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def matches(self, text):
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+FrameworkSpec = namedtuple("FrameworkSpec", ["name", "identity_keywords", "class_keywords", "normalizer"])
+
+# registration order is detection priority when several frameworks match
+FRAMEWORKS = {}
+IDENTITY, ENTITY_CLASS = 0, 1
+_framework_matcher = None
+
+def register_framework(name, identity=(), classes=()):
+    """
+    Decorator registering a framework normalizer.
+    identity: lowercase keywords looked for in the pattern's "framework" field.
+    classes:  lowercase keywords looked for in entity vendorClass names, used
+              only when no framework field matches.
+    """
+    def decorator(normalizer):
+        global _framework_matcher
+        FRAMEWORKS[name] = FrameworkSpec(name, tuple(identity), tuple(classes), normalizer)
+        _framework_matcher = None  # rebuilt on next detection
+        return normalizer
+    return decorator
+
+def framework_matcher():
+    # one automaton for every registered framework and field
+    global _framework_matcher
+    if _framework_matcher is None:
+        keywords = []
+        for rank, spec in enumerate(FRAMEWORKS.values()):
+            keywords += [(kw, (IDENTITY, rank)) for kw in spec.identity_keywords]
+            keywords += [(kw, (ENTITY_CLASS, rank)) for kw in spec.class_keywords]
+        _framework_matcher = KeywordMatcher(keywords)
+    return _framework_matcher
+
 def detect_framework(data):
+    matcher = framework_matcher()
+    names = list(FRAMEWORKS)
+
     fw = (data.get("framework") or "").strip().lower()
-    if "autogen" in fw:
-        return "autogen"
-    if "crewai" in fw:
-        return "crewai"
-    if "langraph" in fw or "langgraph" in fw:
-        return "langgraph"
-    if "mastra" in fw:
-        return "mastraai"
+    ranks = [rank for field, rank in matcher.matches(fw) if field == IDENTITY]
+    if ranks:
+        return names[min(ranks)]
 
     # fallback heuristics: inspect vendorClass names
-    entities = [e.get("vendorClass","").lower() for e in data.get("entities",[])]
-    joined = " ".join(entities)
-    if "assistantagent" in joined or "userproxyagent" in joined or "assistant" in joined:
-        return "autogen"
-    if "crew" in joined or "flow" in joined:
-        return "crewai"
-    if "stategraph" in joined or "node" in joined or "workflow" in joined:
-        return "langgraph"
+    joined = " ".join(e.get("vendorClass","").lower() for e in data.get("entities",[]))
+    ranks = [rank for field, rank in matcher.matches(joined) if field == ENTITY_CLASS]
+    if ranks:
+        return names[min(ranks)]
     return "unknown"
 
 # -------------------------
@@ -227,12 +469,73 @@ def extract_title_from_data(data):
         return data.get("description").split(".")[0].strip()
     return "Unknown"
 
+# -------------------------
+# IRI minting (shared by the normalizers and the mapper)
+# -------------------------
+SAFE_ID_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+IRI_CACHE_SIZE = 1 << 16
+
+class IriMinter:
+    """
+    Builds ex: IRIs and the ids that go into them. Every kind has its own
+    bounded LRU, and results are interned so an IRI minted by many files
+    is a single string object for the whole run. stats() returns the
+    hit/miss counters.
+    """
+
+    def __init__(self, maxsize=IRI_CACHE_SIZE):
+        self.ex = lru_cache(maxsize)(self._ex)
+        self.safe_id = lru_cache(maxsize)(self._safe_id)
+        self.slug = lru_cache(maxsize)(self._slug)
+        self.agent_iris = lru_cache(maxsize)(self._agent_iris)
+
+    @staticmethod
+    def _ex(key):
+        # ensure ex:key format (no leading slash)
+        return sys.intern(f"ex:{key}")
+
+    @staticmethod
+    def _safe_id(base):
+        # convert name to safe resource id
+        return sys.intern(SAFE_ID_CHARS.sub('_', base.strip().lower()))
+
+    @staticmethod
+    def _slug(title):
+        # title slug used for the normalizers' ids
+        return sys.intern(title.lower().replace(" ", "_"))
+
+    def _agent_iris(self, aid):
+        # (agent, goal, task) IRIs for one agent id
+        return self.ex(aid), self.ex(f"goal_{aid}"), self.ex(f"task_{aid}")
+
+    def caches(self):
+        return {"ex": self.ex, "safe_id": self.safe_id, "slug": self.slug, "agent_iris": self.agent_iris}
+
+    def stats(self):
+        per_cache = {}
+        for name, cache in self.caches().items():
+            info = cache.cache_info()
+            per_cache[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize}
+        return {
+            "hits": sum(c["hits"] for c in per_cache.values()),
+            "misses": sum(c["misses"] for c in per_cache.values()),
+            "caches": per_cache,
+        }
+
+    def clear(self):
+        for cache in self.caches().values():
+            cache.cache_clear()
+
+IRI_MINTER = IriMinter()
+
 # -------------------------
 # Normalizers per framework (kept small & consistent)
 # -------------------------
+@register_framework("autogen", identity=("autogen",),
+                    classes=("assistantagent", "userproxyagent", "assistant"))
 def normalize_autogen_to_required_format(data):
     title = extract_title_from_data(data)
-    title_slug = title.lower().replace(" ", "_")
+    title_slug = IRI_MINTER.slug(title)
 
     result = {
         "agents": [],
@@ -280,9 +583,10 @@ def normalize_autogen_to_required_format(data):
 
     return result
 
+@register_framework("crewai", identity=("crewai",), classes=("crew", "flow"))
 def normalize_crewai(data):
     title = extract_title_from_data(data)
-    title_slug = title.lower().replace(" ", "_")
+    title_slug = IRI_MINTER.slug(title)
     result = {
         "systems": [],
         "agents": [],
@@ -329,9 +633,11 @@ def normalize_crewai(data):
 
     return result
 
+@register_framework("langgraph", identity=("langraph", "langgraph"),
+                    classes=("stategraph", "node", "workflow"))
 def normalize_langgraph(data):
     title = extract_title_from_data(data)
-    title_slug = title.lower().replace(" ", "_")
+    title_slug = IRI_MINTER.slug(title)
     result = {"workflowPatterns": [], "nodes": []}
     result["workflowPatterns"].append({
         "id": f"{title_slug}_workflow",
@@ -351,6 +657,7 @@ def normalize_langgraph(data):
             })
     return result
 
+@register_framework("mastraai", identity=("mastra",))
 def normalize_mastraai(data):
     systems = []
     agents = []
@@ -369,7 +676,7 @@ def normalize_mastraai(data):
     else:
         system_name = "MastraAI System"
     systems.append({
-        "id": system_name.lower().replace(" ", "_"),
+        "id": IRI_MINTER.slug(system_name),
         "type": "agento:System",
         "title": system_name,
         "description": data.get("description", "")
@@ -380,7 +687,7 @@ def normalize_mastraai(data):
         if any(k in attrs for k in ("role","instructions","model","name")) and ent.get("id") != "pattern":
             agent_id = attrs.get("name") or ent.get("id")
             if isinstance(agent_id, str):
-                agent_id = agent_id.strip().strip('"').strip("“”").lower().replace(" ", "_")
+                agent_id = IRI_MINTER.slug(agent_id.strip().strip('"').strip("“”"))
             role = attrs.get("role", "")
             instructions = attrs.get("instructions", "")
             model_name = attrs.get("model", "")
@@ -393,7 +700,7 @@ def normalize_mastraai(data):
                 "partOfSystem": systems[0]["id"]
             }
             if model_name:
-                model_id = f"llm_{model_name.lower().replace(' ', '_')}"
+                model_id = f"llm_{IRI_MINTER.slug(model_name)}"
                 llm_models.append({
                     "id": model_id,
                     "type": "agento:LLMModel",
@@ -411,15 +718,9 @@ def normalize_mastraai(data):
 # Framework router to get structured representation
 # -------------------------
 def convert_autogen_to_structured_json(data):
-    fw = detect_framework(data)
-    if fw == "autogen":
-        return normalize_autogen_to_required_format(data)
-    if fw == "crewai":
-        return normalize_crewai(data)
-    if fw == "langgraph":
-        return normalize_langgraph(data)
-    if fw == "mastraai":
-        return normalize_mastraai(data)
+    spec = FRAMEWORKS.get(detect_framework(data))
+    if spec:
+        return spec.normalizer(data)
     # fallback (wrap entities):
     return {"entities": data.get("entities", []), "description": data.get("description","")}
 
@@ -438,20 +739,113 @@ DEFAULT_PREFIXES = {
 }
 
 def mk_ex(key):
-    # ensure ex:key format (no leading slash)
-    return f"ex:{key}"
+    return IRI_MINTER.ex(key)
 
 def safe_id_for_resource(base):
-    # convert name to safe resource id
-    return re.sub(r'[^a-zA-Z0-9_]', '_', base.strip().lower())
+    return IRI_MINTER.safe_id(base)
+
+# Auto-generated goal/task resources (Version A). --generated-goals picks how:
+# - expand: one full :Goal and :Task resource per agent (default)
+# - lazy:   same output, but held as GeneratedResource templates until serialized
+# - omit:   no generated resources and no :hasGoal/:hasTask links
+# - shared: every agent links to one ex:generatedGoal / ex:generatedTask template.
+#   These are IRIs, not blank nodes, so every pattern and output format
+#   (unified, N-Quads, chunks, per-pattern files) names the same two resources
+GENERATED_MODES = ("expand", "lazy", "omit", "shared")
 
-def add_agent_resources(resources, agent_obj):
+GENERATED_TEMPLATES = {
+    "goal": (
+        ("rdf:type", ":Goal"),
+        ("dcterms:title", "Goal for {}"),
+        ("dcterms:description", "Automatically generated goal for {}"),
+    ),
+    "task": (
+        ("rdf:type", ":Task"),
+        ("dcterms:title", "Task for {}"),
+        ("dcterms:description", "Automatically generated task for {}"),
+        (":taskExpectedOutput", "Automatically generated expected output for {}"),
+    ),
+}
+
+SHARED_GENERATED = {
+    "goal": ("ex:generatedGoal", {
+        "rdf:type": ":Goal",
+        "dcterms:title": "Generated goal",
+        "dcterms:description": "Automatically generated goal for the agent linking to it",
+    }),
+    "task": ("ex:generatedTask", {
+        "rdf:type": ":Task",
+        "dcterms:title": "Generated task",
+        "dcterms:description": "Automatically generated task for the agent linking to it",
+        ":taskExpectedOutput": "Automatically generated expected output",
+    }),
+}
+
+class GeneratedResource(Mapping):
+    """
+    Read-only stand-in for a generated goal/task resource: just the template
+    kind and the agent id. Reads like the expanded dict (items(), get, [],
+    ==), so writers expand it while serializing; json.dumps needs
+    default=json_default.
+    """
+    __slots__ = ("kind", "agent")
+
+    def __init__(self, kind, agent):
+        self.kind = kind
+        self.agent = agent
+
+    def __getitem__(self, key):
+        for pred, template in GENERATED_TEMPLATES[self.kind]:
+            if pred == key:
+                return template.format(self.agent)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (pred for pred, _ in GENERATED_TEMPLATES[self.kind])
+
+    def __len__(self):
+        return len(GENERATED_TEMPLATES[self.kind])
+
+    def __repr__(self):
+        return f"GeneratedResource({self.kind!r}, {self.agent!r})"
+
+def json_default(obj):
+    # expands GeneratedResource values for json.dumps
+    if isinstance(obj, GeneratedResource):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def add_generated_resources(resources, agent_res, agent_id, ex_goal, ex_task, generated):
+    if generated == "omit":
+        return
+    if generated == "shared":
+        for kind, pred in (("goal", ":hasGoal"), ("task", ":hasTask")):
+            node, template = SHARED_GENERATED[kind]
+            agent_res[pred] = node
+            if node not in resources:
+                resources[node] = dict(template)
+        return
+    agent_res[":hasGoal"] = ex_goal
+    agent_res[":hasTask"] = ex_task
+    if generated == "lazy":
+        resources[ex_goal] = GeneratedResource("goal", agent_id)
+        resources[ex_task] = GeneratedResource("task", agent_id)
+        return
+    resources[ex_goal] = {
+        pred: template.format(agent_id) for pred, template in GENERATED_TEMPLATES["goal"]
+    }
+    resources[ex_task] = {
+        pred: template.format(agent_id) for pred, template in GENERATED_TEMPLATES["task"]
+    }
+
+def add_agent_resources(resources, agent_obj, generated="expand"):
     """
     Add agent resource and auto-generated goal/task resources (Version A).
     agent_obj expected keys: id, agentID, agentRole, title, description
+    generated: one of GENERATED_MODES
     """
-    aid = agent_obj.get("id") or safe_id_for_resource(agent_obj.get("agentID") or agent_obj.get("title") or "agent")
-    ex_agent = mk_ex(aid)
+    aid = agent_obj.get("id") or IRI_MINTER.safe_id(agent_obj.get("agentID") or agent_obj.get("title") or "agent")
+    ex_agent, ex_goal, ex_task = IRI_MINTER.agent_iris(aid)
     # build agent resource
     agent_res = {"rdf:type": ":Agent"}
     # agentID (prefer the agentID field; fallback to id)
@@ -466,32 +860,11 @@ def add_agent_resources(resources, agent_obj):
         agent_res["dcterms:title"] = agent_obj.get("title")
     if agent_obj.get("description"):
         agent_res["dcterms:description"] = agent_obj.get("description")
-    # make goal & task ids (Version A: always make)
-    goal_id = f"goal_{aid}"
-    task_id = f"task_{aid}"
-    agent_res[":hasGoal"] = mk_ex(goal_id)
-    agent_res[":hasTask"] = mk_ex(task_id)
     resources[ex_agent] = agent_res
-
-    # create goal resource
-    goal_res = {
-        "rdf:type": ":Goal",
-        "dcterms:title": f"Goal for {agent_res.get(':agentID')}",
-        "dcterms:description": f"Automatically generated goal for {agent_res.get(':agentID')}"
-    }
-    resources[mk_ex(goal_id)] = goal_res
-
-    # create task resource with expected output
-    task_res = {
-        "rdf:type": ":Task",
-        "dcterms:title": f"Task for {agent_res.get(':agentID')}",
-        "dcterms:description": f"Automatically generated task for {agent_res.get(':agentID')}",
-        ":taskExpectedOutput": f"Automatically generated expected output for {agent_res.get(':agentID')}"
-    }
-    resources[mk_ex(task_id)] = task_res
+    add_generated_resources(resources, agent_res, agent_res.get(":agentID"), ex_goal, ex_task, generated)
 
 def add_goal_resource(resources, gid, title=None, desc=None):
-    resources[mk_ex(gid)] = {
+    resources[IRI_MINTER.ex(gid)] = {
         "rdf:type": ":Goal",
         "dcterms:title": title or gid,
         "dcterms:description": desc or ""
@@ -504,21 +877,21 @@ def add_task_resource(resources, tid, title=None, desc=None, expected=None):
     if desc:
         task["dcterms:description"] = desc
     task[":taskExpectedOutput"] = expected or ""
-    resources[mk_ex(tid)] = task
+    resources[IRI_MINTER.ex(tid)] = task
 
 def add_workflow_resource(resources, wf):
     # wf expected keys: id, type, title, description
-    wid = wf.get("id") or safe_id_for_resource(wf.get("title","workflow"))
+    wid = wf.get("id") or IRI_MINTER.safe_id(wf.get("title","workflow"))
     res = {"rdf:type": ":WorkflowPattern"}
     if wf.get("title"):
         res["dcterms:title"] = wf.get("title")
     if wf.get("description"):
         res["dcterms:description"] = wf.get("description")
-    resources[mk_ex(wid)] = res
+    resources[IRI_MINTER.ex(wid)] = res
 
 def add_datatype_property_resource(resources, name, domain="agento:Agent", justification="", range_="xsd:string"):
-    rid = safe_id_for_resource(name)
-    resources[mk_ex(f"DatatypeProperty_{rid}")] = {
+    rid = IRI_MINTER.safe_id(name)
+    resources[IRI_MINTER.ex(f"DatatypeProperty_{rid}")] = {
         "rdf:type": "agento:DatatypeProperty",
         "agento:domain": domain,
         "agento:justification": justification,
@@ -526,10 +899,11 @@ def add_datatype_property_resource(resources, name, domain="agento:Agent", justi
         "agento:range": range_
     }
 
-def structured_to_prefixes_resources(structured, raw_autogen):
+def structured_to_prefixes_resources(structured, raw_autogen, generated="expand"):
     """
     Turn normalized structured representation into the prefixes/resources JSON shape.
     This function attempts to support outputs from normalize_{autogen,crewai,langgraph,mastraai}.
+    generated: how auto-generated goals/tasks are emitted (GENERATED_MODES).
     """
     prefixes = DEFAULT_PREFIXES.copy()
     resources = {}
@@ -544,23 +918,23 @@ def structured_to_prefixes_resources(structured, raw_autogen):
             agent_obj = {"id": agent, "agentID": agent, "title": agent}
         else:
             agent_obj = agent
-        add_agent_resources(resources, agent_obj)
+        add_agent_resources(resources, agent_obj, generated)
 
     # 2) if mastra produced 'systems', add them as Workflow/System resources
     for sys_obj in structured.get("systems", []) if isinstance(structured.get("systems", []), list) else []:
-        sid = sys_obj.get("id") or safe_id_for_resource(sys_obj.get("title","system"))
+        sid = sys_obj.get("id") or IRI_MINTER.safe_id(sys_obj.get("title","system"))
         res = {"rdf:type": ":System" if sys_obj.get("type","").lower().endswith("system") else ":WorkflowPattern"}
         if sys_obj.get("title"):
             res["dcterms:title"] = sys_obj.get("title")
         if sys_obj.get("description"):
             res["dcterms:description"] = sys_obj.get("description")
-        resources[mk_ex(sid)] = res
+        resources[IRI_MINTER.ex(sid)] = res
         # if system lists agents, create simple agent resources (do not duplicate goals/tasks if already created)
         if isinstance(sys_obj.get("agents"), (list, tuple)):
             for a in sys_obj.get("agents"):
                 aid = a if isinstance(a, str) else a.get("id")
-                if mk_ex(aid) not in resources:
-                    add_agent_resources(resources, {"id": aid, "agentID": aid, "title": aid})
+                if IRI_MINTER.ex(aid) not in resources:
+                    add_agent_resources(resources, {"id": aid, "agentID": aid, "title": aid}, generated)
 
     # 3) workflowPatterns
     for wf in structured.get("workflowPatterns", []):
@@ -568,18 +942,18 @@ def structured_to_prefixes_resources(structured, raw_autogen):
 
     # 4) nodes (langgraph)
     for node in structured.get("nodes", []):
-        nid = node.get("id") or safe_id_for_resource(node.get("nodeName","node"))
+        nid = node.get("id") or IRI_MINTER.safe_id(node.get("nodeName","node"))
         node_res = {"rdf:type": ":Node"}
         if node.get("nodeName"):
             node_res["dcterms:title"] = node.get("nodeName")
         if node.get("callableLabel"):
             node_res[":callableLabel"] = node.get("callableLabel")
-        resources[mk_ex(nid)] = node_res
+        resources[IRI_MINTER.ex(nid)] = node_res
 
     # 5) llmModels
     for model in structured.get("llmModels", []):
-        mid = model.get("id") or safe_id_for_resource(model.get("modelName","llm"))
-        resources[mk_ex(mid)] = {
+        mid = model.get("id") or IRI_MINTER.safe_id(model.get("modelName","llm"))
+        resources[IRI_MINTER.ex(mid)] = {
             "rdf:type": ":LanguageModel",
             "dcterms:title": model.get("modelName", mid)
         }
@@ -593,8 +967,8 @@ def structured_to_prefixes_resources(structured, raw_autogen):
         add_datatype_property_resource(resources, op.get("name"), domain=op.get("domain", "agento:Agent"), justification=op.get("justification",""), range_=op.get("range","xsd:string"))
     # also add newClasses
     for nc in new_terms.get("newClasses", []):
-        cid = safe_id_for_resource(nc.get("name","class"))
-        resources[mk_ex(cid)] = {
+        cid = IRI_MINTER.safe_id(nc.get("name","class"))
+        resources[IRI_MINTER.ex(cid)] = {
             "rdf:type": "owl:Class",
             "dcterms:title": nc.get("name"),
             "dcterms:description": nc.get("definition","")
@@ -609,16 +983,16 @@ def structured_to_prefixes_resources(structured, raw_autogen):
             name = attrs.get("name") or ent.get("id") or ""
             if "agent" in vc or "assistant" in vc or "userproxy" in vc:
                 # don't overwrite existing resource if present
-                rid = mk_ex(safe_id_for_resource(name or ent.get("id","agent")))
+                rid = IRI_MINTER.ex(IRI_MINTER.safe_id(name or ent.get("id","agent")))
                 if rid not in resources:
                     agent_obj = {
-                        "id": safe_id_for_resource(name or ent.get("id","agent")),
+                        "id": IRI_MINTER.safe_id(name or ent.get("id","agent")),
                         "agentID": name or ent.get("id"),
                         "agentRole": attrs.get("role") or vc.title(),
                         "title": name or ent.get("id"),
                         "description": attrs.get("system_message") or attrs.get("systemMessage") or attrs.get("instructions","")
                     }
-                    add_agent_resources(resources, agent_obj)
+                    add_agent_resources(resources, agent_obj, generated)
 
     return {"prefixes": prefixes, "resources": resources}
 
@@ -626,44 +1000,282 @@ def structured_to_prefixes_resources(structured, raw_autogen):
 # -------------------------
 # File processing
 # -------------------------
-def process_file_text_to_json(text):
+def process_file_text_to_json(text, path=None, generated="expand"):
     # parse raw -> autogen intermediate
-    raw = convert_pattern_to_autogen(text)
+    raw = convert_pattern_to_autogen(text, path)
     # structured normalization
     structured = convert_autogen_to_structured_json(raw)
     # convert to prefixes/resources shape
-    packaged = structured_to_prefixes_resources(structured, raw)
+    packaged = structured_to_prefixes_resources(structured, raw, generated)
     return packaged
 
-def process_folder(input_root, output_root):
+def iter_input_files(input_root, output_root):
+    # (input_path, output_file) for every .txt, sorted by folder then file
     for root, dirs, files in os.walk(input_root):
-        for file in files:
+        # sorted, so the same IRI gets the same identity owner on every machine
+        dirs.sort()
+        for file in sorted(files):
             if file.endswith(".txt"):
                 input_path = os.path.join(root, file)
                 rel_path = os.path.relpath(root, input_root)
                 output_dir = os.path.join(output_root, rel_path)
                 os.makedirs(output_dir, exist_ok=True)
+                yield input_path, os.path.join(output_dir, file.replace(".txt", ".json"))
+
+def convert_input_file(input_path, fmt="json", claims=False, generated="expand"):
+    """
+    Convert one analyzed .txt to its encoded output: pretty JSON text
+    (fmt="json") or a compact shard line (fmt="jsonl").
+    Returns (text, error_message, claims, size); a parse failure yields the
+    empty fallback package instead of raising, so one bad file can't stop a
+    batch. claims is the identity index input (see identity_index), or None;
+    size is (entities, triples) for run reports.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    error = None
+    try:
+        packaged = process_file_text_to_json(text, input_path, generated)
+    except Exception as e:
+        error = f"[ERROR] Failed parsing {input_path}: {e}"
+        packaged = {"prefixes": DEFAULT_PREFIXES, "resources": {}, "error": str(e)}
+
+    claimed = pattern_claims(packaged["resources"]) if claims else None
+    return encode_output(input_path, packaged, fmt), error, claimed, graph_size(packaged)
+
+def encode_output(input_path, packaged, fmt="json"):
+    if fmt == "jsonl":
+        name = os.path.splitext(os.path.basename(input_path))[0]
+        return encode_record(name, packaged, DEFAULT_PREFIXES, default=json_default)
+    return json.dumps(packaged, ensure_ascii=False, indent=2, default=json_default)
+
+def decode_output(payload, fmt="json"):
+    if fmt == "jsonl":
+        return decode_record(None, payload, DEFAULT_PREFIXES)[1]
+    return json.loads(payload)
+
+def resolve_identity(index, input_path, key, payload, claims, fmt="json"):
+    """
+    Claim a converted file's IRIs in the identity index (main process, in
+    input order, so parallel runs rename exactly like serial ones) and
+    re-encode the payload when the policy renamed any of them.
+    """
+    pattern_key = pattern_key_for(key)
+    renames = index.resolve(pattern_key, claims)
+    if not renames:
+        return payload
+    packaged = apply_renames(decode_output(payload, fmt), renames, pattern_key, index.policy)
+    return encode_output(input_path, packaged, fmt)
+
+def pool_chunksize(n_jobs, workers):
+    # a few chunks per worker keeps the pool balanced without per-file IPC
+    return max(1, n_jobs // (workers * 4))
+
+def start_map(func, inputs, workers):
+    """
+    Lazily map func over inputs, across a process pool when workers > 1.
+    Returns (results, pool); results keep input order. Shut the pool down
+    (if any) once the results are consumed.
+    """
+    if workers > 1 and len(inputs) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        return pool.map(func, inputs, chunksize=pool_chunksize(len(inputs), workers)), pool
+    return map(func, inputs), None
+
+def open_identity_index(output_root, identity):
+    # None when identity tracking is off
+    return IdentityIndex(output_root, identity) if identity else None
+
+def identity_stale(index, key):
+    # True when the identity index asks for this input to be resolved again
+    return bool(index) and pattern_key_for(key) in index.stale
+
+def close_identity_index(index):
+    if index:
+        index.save()
+        index.report()
+
+def process_folder(input_root, output_root, workers=1, force=False, identity=None, generated="expand",
+                   report=None):
+    config = {}
+    if identity:
+        config["identity"] = identity
+    if generated != "expand":
+        config["generated"] = generated
+    manifest = BuildManifest(output_root, converter_digest(CODE_PATHS, config))
+    index = open_identity_index(output_root, identity)
+
+    paths = [(input_path, output_file, manifest_key(input_path, input_root))
+             for input_path, output_file in iter_input_files(input_root, output_root)]
+    if index:
+        # before anything is claimed, so sharers of vanished owners are redone this run
+        index.forget_missing(pattern_key_for(key) for _, _, key in paths)
+    jobs = []
+    for input_path, output_file, key in paths:
+        digest = file_digest(input_path)
+        fresh = not force and manifest.is_fresh(key, digest) and not identity_stale(index, key)
+        jobs.append((input_path, output_file, key, digest, fresh))
+
+    worker = Timed(partial(convert_input_file, claims=bool(index), generated=generated))
 
-                with open(input_path, "r", encoding="utf-8") as f:
-                    text = f.read()
+    def build(batch):
+        inputs = [job[0] for job in batch if not job[4]]
+        results, pool = start_map(worker, inputs, workers)
+        try:
+            # results come back in submission order, so writes and logs match a serial run
+            for input_path, output_file, key, digest, fresh in batch:
+                if fresh:
+                    print(f"Unchanged: {input_path} -> {output_file}")
+                    if report:
+                        report.file(key, "unchanged")
+                    continue
 
-                try:
-                    packaged = process_file_text_to_json(text)
-                except Exception as e:
-                    print(f"[ERROR] Failed parsing {input_path}: {e}")
-                    packaged = {"prefixes": DEFAULT_PREFIXES, "resources": {}, "error": str(e)}
+                (payload, error, claims, size), wall, cpu = next(results)
+                if error:
+                    print(error)
+                elif index:
+                    payload = resolve_identity(index, input_path, key, payload, claims)
 
-                output_file = os.path.join(output_dir, file.replace(".txt", ".json"))
                 with open(output_file, "w", encoding="utf-8") as f:
-                    json.dump(packaged, f, ensure_ascii=False, indent=2)
+                    f.write(payload)
+
+                if error:
+                    # failed files are retried on the next run
+                    manifest.forget(key)
+                else:
+                    manifest.record(key, digest, {output_file: bytes_digest(payload)})
+                if report:
+                    report.file(key, "error" if error else "built", size, wall, cpu)
 
                 print(f"Processed: {input_path} -> {output_file}")
+        finally:
+            if pool:
+                pool.shutdown()
+
+    try:
+        build(jobs)
+        # an owner whose properties changed made unchanged sharers stale: resolve them again
+        build([(*job[:4], False) for job in jobs if job[4] and identity_stale(index, job[2])])
+    finally:
+        manifest.save()
+    close_identity_index(index)
+
+def process_folder_shards(input_root, output_root, workers=1, force=False, shard_size=DEFAULT_SHARD_SIZE,
+                          identity=None, generated="expand", report=None):
+    """
+    Compact mode: every input folder becomes JSON Lines shards in the matching
+    output folder (see jsonl_shards). A folder's shards are rewritten as a
+    whole, so the manifest tracks folders rather than single files.
+    """
+    config = {"format": "jsonl", "shard_size": shard_size}
+    if identity:
+        config["identity"] = identity
+    if generated != "expand":
+        config["generated"] = generated
+    manifest = BuildManifest(output_root, converter_digest(CODE_PATHS, config))
+    index = open_identity_index(output_root, identity)
+
+    groups = []
+    for root, dirs, files in os.walk(input_root):
+        # sorted, so shard contents and identity owners don't depend on directory order
+        dirs.sort()
+        inputs = [os.path.join(root, file) for file in sorted(files) if file.endswith(".txt")]
+        if not inputs:
+            continue
+        output_dir = os.path.join(output_root, os.path.relpath(root, input_root))
+        key = manifest_key(os.path.join(root, "*.txt"), input_root)
+        digest = bytes_digest("\n".join(f"{manifest_key(p, input_root)} {file_digest(p)}" for p in inputs))
+        groups.append((root, output_dir, inputs, key, digest))
+    if index:
+        index.forget_missing(pattern_key_for(manifest_key(p, input_root)) for g in groups for p in g[2])
+
+    def stale(group_inputs):
+        return any(identity_stale(index, manifest_key(p, input_root)) for p in group_inputs)
+
+    groups = [(*group, not force and manifest.is_fresh(group[3], group[4]) and not stale(group[2]))
+              for group in groups]
+    worker = Timed(partial(convert_input_file, fmt="jsonl", claims=bool(index), generated=generated))
+
+    def build(batch):
+        inputs = [p for group in batch if not group[5] for p in group[2]]
+        results, pool = start_map(worker, inputs, workers)
+        try:
+            for root, output_dir, group_inputs, key, digest, fresh in batch:
+                if fresh:
+                    print(f"Unchanged: {root} -> {output_dir}")
+                    if report:
+                        for input_path in group_inputs:
+                            report.file(manifest_key(input_path, input_root), "unchanged")
+                    continue
+
+                remove_shards(output_dir)
+                os.makedirs(output_dir, exist_ok=True)
+                failed = False
+                with ShardWriter(output_dir, DEFAULT_PREFIXES, shard_size) as shards:
+                    for input_path in group_inputs:
+                        (line, error, claims, size), wall, cpu = next(results)
+                        key_path = manifest_key(input_path, input_root)
+                        if error:
+                            print(error)
+                            failed = True
+                        elif index:
+                            line = resolve_identity(index, input_path, key_path, line, claims, fmt="jsonl")
+                        shard_path = shards.write(line)
+                        if report:
+                            report.file(key_path, "error" if error else "built", size, wall, cpu)
+                        print(f"Processed: {input_path} -> {shard_path}")
+
+                if failed:
+                    manifest.forget(key)
+                else:
+                    manifest.record(key, digest, {p: file_digest(p) for p in shards.paths})
+        finally:
+            if pool:
+                pool.shutdown()
+
+    try:
+        build(groups)
+        # folders holding a sharer made stale by an owner's change are rebuilt
+        build([(*group[:5], False) for group in groups if group[5] and stale(group[2])])
+    finally:
+        manifest.save()
+    close_identity_index(index)
 
 # -------------------------
 # MAIN ENTRY
 # -------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert analyzed pattern .txt files to prefixes/resources JSON.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU, default 1 = serial)")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every file, ignoring the build manifest")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json",
+                        help="json: one indented file per pattern in data/json_data, easy to read and "
+                             "diff (default); jsonl: compact JSON Lines shards in data/jsonl_data")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help="patterns per jsonl shard (default 1000)")
+    parser.add_argument("--identity", choices=POLICIES,
+                        help="track minted IRIs in a corpus-wide index and resolve collisions: keep (report "
+                             "only), namespace (per-pattern namespace) or hash (stable suffix); off by default")
+    parser.add_argument("--generated-goals", choices=GENERATED_MODES, default="expand",
+                        help="auto-generated goal/task per agent: expand (default), lazy (same output, expanded "
+                             "while writing), omit, or shared (one ex:generatedGoal/ex:generatedTask template)")
+    parser.add_argument("--report", metavar="FILE",
+                        help="append a JSON Lines run report (per-file entities, triples, wall/CPU time) to FILE")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     input_root = os.path.join(script_dir, "data", "analyzed_data")
-    output_root = os.path.join(script_dir, "data", "json_data")
-    process_folder(input_root, output_root)
+    with open_report(args.report, "analyzed-parser") as report:
+        if args.format == "jsonl":
+            output_root = os.path.join(script_dir, "data", "jsonl_data")
+            process_folder_shards(input_root, output_root, workers=workers, force=args.force,
+                                  shard_size=args.shard_size, identity=args.identity, generated=args.generated_goals,
+                                  report=report)
+        else:
+            output_root = os.path.join(script_dir, "data", "json_data")
+            process_folder(input_root, output_root, workers=workers, force=args.force, identity=args.identity,
+                           generated=args.generated_goals, report=report)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+bench_example_split.py
+Benchmark for the "Contoh nilai" splitter used by parse_entities.
+
+- Checks that split_example_values gives the same attribute dicts as the
+  former lookahead regex for every entity row in data/analyzed_data.
+- Times both on synthetic cells of growing length (many commas and quoted
+  values, like the long CrewAI / Mastra system messages). The regex grows
+  quadratically; the tokenizer should grow linearly.
+
+Run from the repository root:  py benchmarks/bench_example_split.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import analyzed_parser
+
+LEGACY_SPLIT = re.compile(r',\s*(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+
+def legacy_split(example):
+    return [e.strip() for e in LEGACY_SPLIT.split(example)]
+
+
+def attribute_dict(attrs, values):
+    values = [v.strip().strip('"').strip("“”") for v in values]
+    names = [a.strip() for a in attrs.split(",")] if attrs else []
+    return {a: values[i] for i, a in enumerate(names) if i < len(values)}
+
+
+def check_corpus():
+    rows = 0
+    root = os.path.join(REPO_ROOT, "data", "analyzed_data")
+    for dirpath, _, files in os.walk(root):
+        for file in sorted(files):
+            if not file.endswith(".txt"):
+                continue
+            with open(os.path.join(dirpath, file), "r", encoding="utf-8") as f:
+                text = f.read()
+            for row in analyzed_parser.lex_sections(text):
+                if row.section != "Analisis Struktur Pattern" or row.index < 0:
+                    continue
+                attrs, example = row.cells[2], row.cells[3]
+                if not example:
+                    continue
+                old = attribute_dict(attrs, legacy_split(example))
+                new = attribute_dict(attrs, analyzed_parser.split_example_values(example))
+                if old != new:
+                    raise SystemExit(f"MISMATCH in {file}: {old} != {new}")
+                rows += 1
+    print(f"corpus: {rows} entity rows give identical attribute dicts")
+
+
+def synthetic_cell(n_values):
+    parts = []
+    for i in range(n_values):
+        if i % 3 == 0:
+            parts.append(f'"You are agent {i}, be concise, cite sources"')
+        else:
+            parts.append(f"value_{i}")
+    return ", ".join(parts)
+
+
+def bench():
+    print(f"{'chars':>8} {'regex ms':>10} {'tokenizer ms':>13} {'speedup':>8}")
+    for n_values in (25, 50, 100, 200, 400, 800):
+        cell = synthetic_cell(n_values)
+        assert legacy_split(cell) == analyzed_parser.split_example_values(cell)
+        number = max(1, 2000 // n_values)
+        old = min(timeit.repeat(lambda: legacy_split(cell), number=number, repeat=3)) / number
+        new = min(timeit.repeat(lambda: analyzed_parser.split_example_values(cell), number=number, repeat=3)) / number
+        print(f"{len(cell):>8} {old * 1000:>10.3f} {new * 1000:>13.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    check_corpus()
+    bench()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+bench_iri_minting.py
+Benchmark for the shared IriMinter used by the normalizers and the mapper.
+
+- Parses every pattern in data/analyzed_data once, then times the
+  normalize + structured_to_prefixes_resources step over the whole batch,
+  repeated to mimic a large run, with caching on and off (maxsize=0).
+- Checks both give identical resources and prints the minter's hit/miss
+  counters for the cached run.
+
+Run from the repository root:  py benchmarks/bench_iri_minting.py
+"""
+
+import os
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pipeline import analyzed_parser
+
+REPEAT = 50
+
+
+def load_corpus():
+    raws = []
+    root = os.path.join(REPO_ROOT, "data", "analyzed_data")
+    for dirpath, _, files in os.walk(root):
+        for file in sorted(files):
+            if file.endswith(".txt"):
+                path = os.path.join(dirpath, file)
+                with open(path, "r", encoding="utf-8") as f:
+                    raws.append(analyzed_parser.convert_pattern_to_autogen(f.read(), path))
+    return raws
+
+
+def map_batch(raws):
+    out = []
+    for _ in range(REPEAT):
+        for raw in raws:
+            structured = analyzed_parser.convert_autogen_to_structured_json(raw)
+            out.append(analyzed_parser.structured_to_prefixes_resources(structured, raw))
+    return out
+
+
+def run_with(minter, raws):
+    analyzed_parser.IRI_MINTER = minter
+    result = map_batch(raws)
+    seconds = min(timeit.repeat(lambda: map_batch(raws), number=1, repeat=3))
+    return result, seconds
+
+
+if __name__ == "__main__":
+    raws = load_corpus()
+    uncached, t_off = run_with(analyzed_parser.IriMinter(maxsize=0), raws)
+    minter = analyzed_parser.IriMinter()
+    cached, t_on = run_with(minter, raws)
+    if cached != uncached:
+        raise SystemExit("MISMATCH between cached and uncached minting")
+
+    n = len(raws) * REPEAT
+    print(f"{n} patterns mapped, identical output")
+    print(f"no cache : {t_off * 1000:8.1f} ms")
+    print(f"LRU cache: {t_on * 1000:8.1f} ms  ({t_off / t_on:.2f}x)")
+    stats = minter.stats()
+    print(f"minter   : {stats['hits']} hits, {stats['misses']} misses")
+    for name, c in stats["caches"].items():
+        print(f"  {name:<10} hits={c['hits']:<8} misses={c['misses']:<6} size={c['size']}")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+bench_literal_encoder.py
+Micro-benchmark for json-parser's literal encoder (to_turtle_value).
+
+- corpus: every object value of data/json_data, as the Turtle writer sees them
+- escaped: multi-line descriptions full of quotes, backslashes and tabs
+  (the worst case: every value takes the escaping path)
+- Compares with the former encoder, the ':' heuristic plus json.dumps.
+  Throughput is MB of input text (UTF-8) per second.
+
+Run from the repository root:  py benchmarks/bench_literal_encoder.py --repeat 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from jsonl_shards import iter_pattern_documents
+from pipeline import json_parser
+
+
+def json_dumps_value(value, prefixes):
+    # the encoder to_turtle_value replaced
+    if isinstance(value, str) and not value.startswith("http") and ":" in value and " " not in value:
+        return value
+    return json.dumps(str(value))
+
+
+def corpus_values():
+    values = []
+    for _, data in iter_pattern_documents(os.path.join(REPO_ROOT, "data", "json_data")):
+        prefixes = data.get("prefixes", {})
+        values += [(obj, prefixes) for properties in data.get("resources", {}).values() for obj in properties.values()]
+    return values
+
+
+def escaped_values(prefixes, count=1000):
+    line = 'Step {i}: call "search(query)" then parse C:\\data\\out.json;\treturn the "best" match'
+    return [("\n".join(line.format(i=i + j) for j in range(8)), prefixes) for i in range(count)]
+
+
+def timed(label, encode, values, repeat):
+    size = sum(len(str(value).encode("utf-8")) for value, _ in values) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for value, prefixes in values:
+            encode(value, prefixes)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<16} {elapsed:>7.3f}s {size / elapsed / 1e6:>7.1f} MB/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=100, help="passes over each value set (default 100)")
+    args = parser.parse_args()
+
+    corpus = corpus_values()
+    sets = [("corpus", corpus), ("escaped", escaped_values(corpus[0][1]))]
+    for name, values in sets:
+        print(f"{name}: {len(values)} values")
+        timed("to_turtle_value", json_parser.to_turtle_value, values, args.repeat)
+        timed("json.dumps", json_dumps_value, values, args.repeat)
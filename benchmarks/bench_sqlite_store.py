@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+bench_sqlite_store.py
+Benchmark for sqlite_store.SqliteStore bulk loading and startup.
+
+- Bulk-loads --copies replicas of data/json_data into a fresh database.
+- Re-runs the load with nothing changed (digest check only) and with one
+  pattern changed.
+- Compares rebuilding an in-memory TripleStore from the database with
+  re-reading the pattern documents.
+
+Run from the repository root:  py benchmarks/bench_sqlite_store.py --copies 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bench_triple_store import replicated
+from jsonl_shards import iter_pattern_documents
+from sqlite_store import SqliteStore
+from triple_store import TripleStore
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28} {time.perf_counter() - start:>7.2f}s")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=200, help="copies of the corpus to load (default 200)")
+    args = parser.parse_args()
+
+    patterns = list(replicated(list(iter_pattern_documents(os.path.join(REPO_ROOT, "data", "json_data"))),
+                               args.copies))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.sqlite")
+        with SqliteStore(path) as db:
+            stats = timed("bulk load", lambda: db.load(patterns, quiet=True))
+            print(f"  {stats['quads']} quads, {len(db)} triples, {os.path.getsize(path) / 1e6:.1f} MB")
+            timed("reload, nothing changed", lambda: db.load(patterns, quiet=True))
+            key, packaged = patterns[0]
+            changed = {"prefixes": packaged["prefixes"],
+                       "resources": {**packaged["resources"], "ex:bench_marker": {"rdfs:label": "changed"}}}
+            timed("reload, one pattern changed", lambda: db.load([(key, changed)] + patterns[1:], quiet=True))
+        with SqliteStore(path) as db:
+            timed("TripleStore from database", db.load_triple_store)
+        timed("TripleStore from parsed docs", lambda: TripleStore().load(patterns))
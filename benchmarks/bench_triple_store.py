@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+bench_triple_store.py
+Benchmark for triple_store.TripleStore lookups on a large graph.
+
+- Replicates every pattern in data/json_data --copies times (subjects get a
+  per-copy suffix, so the copies are distinct triples) and loads them.
+- Times wildcard lookups of each shape (s??, ?p?, ??o, sp?, ?po, s?o, spo)
+  and count() against the loaded store.
+
+Run from the repository root:  py benchmarks/bench_triple_store.py --copies 1000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from jsonl_shards import iter_pattern_documents
+from triple_store import TripleStore
+
+
+def replicated(patterns, copies):
+    for i in range(copies):
+        for key, packaged in patterns:
+            resources = {}
+            for subject, properties in packaged["resources"].items():
+                resources[f"{subject}_c{i}"] = {
+                    p: (f"{o}_c{i}" if o in packaged["resources"] else o) for p, o in properties.items()
+                }
+            yield f"{key}_c{i}", {"prefixes": packaged["prefixes"], "resources": resources}
+
+
+def bench(store, n_lookups=2000):
+    sample = random.Random(0).sample(list(store.triples_ids()), n_lookups)
+    decode = store.terms.decode
+    shapes = {
+        "s??": (1, 0, 0), "?p?": (0, 1, 0), "??o": (0, 0, 1),
+        "sp?": (1, 1, 0), "?po": (0, 1, 1), "s?o": (1, 0, 1), "spo": (1, 1, 1),
+    }
+    print(f"{'shape':>6} {'lookup us':>10} {'count us':>9} {'avg matches':>12}")
+    for name, mask in shapes.items():
+        patterns = [tuple(decode(t[i]) if mask[i] else None for i in range(3)) for t in sample]
+        # ?p? over a common predicate returns a large share of the store; cap the materialization
+        limit = 100
+
+        def lookup():
+            for pattern in patterns:
+                for n, _ in enumerate(store.triples(pattern)):
+                    if n >= limit:
+                        break
+
+        def count():
+            for pattern in patterns:
+                store.count(pattern)
+
+        t_lookup = min(timeit.repeat(lookup, number=1, repeat=3)) / len(patterns)
+        t_count = min(timeit.repeat(count, number=1, repeat=3)) / len(patterns)
+        matches = sum(store.count(p) for p in patterns) / len(patterns)
+        print(f"{name:>6} {t_lookup * 1e6:>10.1f} {t_count * 1e6:>9.1f} {matches:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=200, help="copies of the corpus to load (default 200)")
+    args = parser.parse_args()
+
+    patterns = list(iter_pattern_documents(os.path.join(REPO_ROOT, "data", "json_data")))
+    start = time.perf_counter()
+    store = TripleStore().load(replicated(patterns, args.copies))
+    elapsed = time.perf_counter() - start
+    print(f"loaded {len(store)} triples, {len(store.terms)} terms in {elapsed:.1f}s "
+          f"({len(store) / elapsed:,.0f} triples/s)")
+    print("(lookup times materialize at most 100 matches per pattern)")
+    bench(store)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+bench_turtle_reader.py
+Benchmark for turtle_reader.TurtleReader on a large unified graph.
+
+- Writes the unified graph --copies times into one temporary Turtle file
+  (each copy's ex: subjects get a per-copy prefix, so the copies are
+  distinct triples) and streams it through TurtleReader.
+- When rdflib is installed, parses the same file with rdflib for comparison.
+
+Run from the repository root:  py benchmarks/bench_turtle_reader.py --copies 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from jsonl_shards import iter_pattern_documents
+from pipeline import json_parser
+from turtle_reader import TurtleReader
+from unified_graph import merge_patterns
+
+
+def write_copies(path, copies):
+    merged = merge_patterns(iter_pattern_documents(os.path.join(REPO_ROOT, "data", "json_data")))
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(copies):
+            prefixes = dict(merged.prefixes, ex=f"{merged.prefixes['ex']}c{i}_")
+            writer = json_parser.TurtleWriter(f)
+            writer.prefixes(prefixes)
+            for subject, properties in merged.subjects.items():
+                writer.subject(subject, [(p, o) for p, objects in properties.items() for o in objects])
+
+
+def timed(label, fn, size):
+    start = time.perf_counter()
+    n = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} {n:>10} triples {elapsed:>7.2f}s {n / elapsed:>12,.0f} triples/s "
+          f"{size / elapsed / 1e6:>6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, default=50, help="copies of the unified graph (default 50)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "unified.ttl")
+        write_copies(path, args.copies)
+        size = os.path.getsize(path)
+        print(f"{path}: {size / 1e6:.1f} MB")
+
+        def read():
+            with open(path, "r", encoding="utf-8") as f:
+                return sum(1 for _ in TurtleReader(f))
+        timed("turtle_reader", read, size)
+
+        try:
+            import rdflib
+        except ImportError:
+            print("rdflib not installed, no comparison")
+        else:
+            timed("rdflib", lambda: len(rdflib.Graph().parse(path, format="turtle")), size)
@@ -0,0 +1,110 @@
+"""
+build_manifest.py
+Content-hash build manifest shared by the conversion stages.
+
+One manifest file lives next to each stage's outputs (data/json_data,
+data/ttl_data). It records, per input file:
+- the sha256 of the input,
+- the sha256 of every output it produced,
+and, for the whole stage, a fingerprint of the converter code and config.
+
+A stage asks is_fresh() before converting a file and skips it when the input,
+the converter and the outputs on disk are all unchanged since the last run.
+Because the JSON stage only rewrites files whose .txt changed, the TTL stage
+then only sees those JSON files change too.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build-manifest"
+MANIFEST_VERSION = 1
+
+
+def bytes_digest(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def converter_digest(code_paths, config=None):
+    """
+    Fingerprint of the code and options that shape a stage's output.
+    Any change to one of code_paths or to config invalidates the whole manifest.
+    """
+    h = hashlib.sha256()
+    for path in code_paths:
+        h.update(os.path.basename(path).encode("utf-8"))
+        h.update(file_digest(path).encode("ascii"))
+    h.update(json.dumps(config or {}, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def manifest_key(path, root):
+    # stable across platforms: relative path with forward slashes
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+class BuildManifest:
+    def __init__(self, output_root, converter, name=MANIFEST_NAME):
+        self.root = output_root
+        # stages that share an output folder keep separate manifests (name)
+        self.path = os.path.join(output_root, name)
+        self.converter = converter
+        self.entries = {}
+        self.seen = set()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError):
+                stored = {}
+            # a different converter or manifest layout means nothing is reusable
+            if stored.get("version") == MANIFEST_VERSION and stored.get("converter") == converter:
+                self.entries = stored.get("entries", {})
+
+    def is_fresh(self, key, input_digest):
+        """
+        True when key was built from an input with input_digest by the current
+        converter, and every output it recorded is still on disk unchanged.
+        """
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if not entry or entry.get("input") != input_digest:
+            return False
+        for rel_output, digest in entry.get("outputs", {}).items():
+            output_path = os.path.join(self.root, rel_output)
+            if not os.path.exists(output_path) or file_digest(output_path) != digest:
+                return False
+        return True
+
+    def record(self, key, input_digest, outputs):
+        # outputs: {output_path: sha256 of the bytes written}
+        self.seen.add(key)
+        self.entries[key] = {
+            "input": input_digest,
+            "outputs": {manifest_key(p, self.root): d for p, d in outputs.items()},
+        }
+
+    def forget(self, key):
+        self.entries.pop(key, None)
+
+    def save(self):
+        # drop inputs that disappeared since the last run
+        entries = {k: v for k, v in sorted(self.entries.items()) if k in self.seen}
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "converter": self.converter, "entries": entries},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+graph_delta.py
+Triples added and removed between two builds, so a triple store can be
+patched instead of dropped and reloaded.
+
+Behavior:
+- A build is a folder of per-pattern .json files or .jsonl shards, e.g. a
+  copy of data/json_data from the last published build and the current one.
+- Each pattern's graph becomes its sorted, distinct N-Triples lines plus a
+  hash of them; patterns whose hash did not change are never diffed.
+- --scope patterns (default): one delta per pattern, in the pattern's named
+  graph (the json-parser --format nq / sqlite_store layout). Only the old
+  build is spooled, to a temporary file; each changed pattern is merge-joined
+  against its spooled segment, so one pattern at a time is in memory.
+- --scope global: the delta of the unified graph (union of all patterns).
+  Both builds are sorted externally: runs of at most --run-lines lines are
+  sorted, spilled to temporary files and merged with heapq.merge, so memory
+  stays bounded however large the builds grow.
+- --format nt writes <output>/removed.nq and added.nq (.nt for global);
+  --format sparql writes <output>/update.ru with DELETE DATA / INSERT DATA.
+  DELETE DATA cannot name blank nodes, so removed blank node triples go into
+  a DELETE WHERE per graph, with the blank nodes as variables.
+
+    py graph_delta.py previous/json_data                      # vs data/json_data
+    py graph_delta.py previous/json_data data/json_data --scope global --format sparql
+"""
+
+import argparse
+import hashlib
+import heapq
+import os
+import re
+import sys
+import tempfile
+import time
+from itertools import groupby
+from operator import itemgetter
+
+from jsonl_shards import iter_pattern_documents
+from pipeline import json_parser
+from triple_store import NQUAD
+
+RUN_LINES = 1_000_000
+MERGE_FAN = 64
+REMOVED, ADDED = "removed", "added"
+
+
+# -------------------------
+# Sorted triple streams
+# -------------------------
+def pattern_lines(packaged):
+    # a pattern's graph as sorted, distinct N-Triples lines
+    return sorted(set(json_parser.iter_ntriples(packaged)))
+
+
+def lines_digest(lines):
+    h = hashlib.sha256()
+    for line in lines:
+        h.update(line.encode("utf-8"))
+    return h.hexdigest()
+
+
+def unique(lines):
+    # drop adjacent duplicates from a sorted stream
+    last = None
+    for line in lines:
+        if line != last:
+            yield line
+            last = line
+
+
+def spill(lines, tmp_dir):
+    # write sorted lines to a new run file -> its path
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with open(fd, "w", encoding="utf-8", newline="\n", buffering=1 << 16) as f:
+        f.writelines(lines)
+    return path
+
+
+def read_run(path):
+    with open(path, "r", encoding="utf-8", newline="\n", buffering=1 << 16) as f:
+        yield from f
+
+
+def merge_runs(paths, tmp_dir):
+    """
+    One sorted, distinct stream from sorted run files. More than MERGE_FAN
+    runs are merged in rounds, so no more than MERGE_FAN files are open.
+    """
+    while len(paths) > MERGE_FAN:
+        groups = [paths[i:i + MERGE_FAN] for i in range(0, len(paths), MERGE_FAN)]
+        merged = [spill(unique(heapq.merge(*map(read_run, group))), tmp_dir) for group in groups]
+        for path in paths:
+            os.remove(path)
+        paths = merged
+    return unique(heapq.merge(*map(read_run, paths)))
+
+
+def sorted_build(input_root, tmp_dir, run_lines=RUN_LINES):
+    """
+    Externally sort a build's union graph -> (digests, lines): the pattern
+    digests by key and the build's sorted, distinct lines as a stream.
+    """
+    digests, runs, run = {}, [], set()
+    for key, packaged in iter_pattern_documents(input_root):
+        lines = pattern_lines(packaged)
+        digests[key] = lines_digest(lines)
+        run.update(lines)
+        if len(run) >= run_lines:
+            runs.append(spill(sorted(run), tmp_dir))
+            run = set()
+    if run:
+        runs.append(spill(sorted(run), tmp_dir))
+    return digests, merge_runs(runs, tmp_dir)
+
+
+def diff_sorted(old, new):
+    """
+    Merge-join two sorted, distinct line streams -> (REMOVED | ADDED, line).
+    """
+    old, new = iter(old), iter(new)
+    a, b = next(old, None), next(new, None)
+    while a is not None or b is not None:
+        if b is None or a is not None and a < b:
+            yield REMOVED, a
+            a = next(old, None)
+        elif a is None or b < a:
+            yield ADDED, b
+            b = next(new, None)
+        else:
+            a, b = next(old, None), next(new, None)
+
+
+# -------------------------
+# Output
+# -------------------------
+class PatchWriter:
+    """
+    Streams a delta into <output_dir>/removed<suffix> and added<suffix>,
+    adding the graph term to each line when one is given (N-Quads).
+    """
+
+    def __init__(self, output_dir, suffix):
+        os.makedirs(output_dir, exist_ok=True)
+        self.paths = {op: os.path.join(output_dir, op + suffix) for op in (REMOVED, ADDED)}
+        self.counts = {REMOVED: 0, ADDED: 0}
+        self._files = {op: open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 16)
+                       for op, path in self.paths.items()}
+
+    def write(self, op, line, graph=None):
+        if graph:
+            line = f"{line[:-3]} {graph} .\n"
+        self._files[op].write(line)
+        self.counts[op] += 1
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def sparql_variable(term):
+    # _:generatedGoal -> ?generatedGoal
+    return "?" + re.sub(r"\W", "_", term[2:])
+
+
+class UpdateBlock:
+    """
+    Writes one SPARQL Update operation (e.g. "DELETE DATA") with its triples
+    grouped in GRAPH blocks; nothing at all when no triple is written.
+    """
+
+    def __init__(self, out, operation):
+        self.out = out
+        self.operation = operation
+        self.graph = None
+        self.written = False
+
+    def triple(self, s, p, o, g=None):
+        write = self.out.write
+        if not self.written:
+            write(f"{self.operation} {{\n")
+            self.written = True
+        if g != self.graph:
+            if self.graph:
+                write("  }\n")
+            if g:
+                write(f"  GRAPH {g} {{\n")
+            self.graph = g
+        write(f"{'    ' if g else '  '}{s} {p} {o} .\n")
+
+    def close(self):
+        if self.written:
+            self.out.write("  }\n} ;\n" if self.graph else "} ;\n")
+
+
+def iter_patch(path):
+    # (s, p, o, g or None) of a patch file written by PatchWriter
+    with open(path, "r", encoding="utf-8", newline="\n") as f:
+        for line in f:
+            yield NQUAD.match(line.rstrip("\n")).groups()
+
+
+def write_sparql_update(paths, out):
+    """
+    Turn removed/added patch files into one SPARQL Update request:
+    DELETE DATA, DELETE WHERE (blank node triples), then INSERT DATA.
+    """
+    deletes, inserts = UpdateBlock(out, "DELETE DATA"), UpdateBlock(out, "INSERT DATA")
+    blank = []
+    for s, p, o, g in iter_patch(paths[REMOVED]):
+        if s.startswith("_:") or o.startswith("_:"):
+            blank.append((s, p, o, g))
+        else:
+            deletes.triple(s, p, o, g)
+    deletes.close()
+    # one operation per graph: the same label is a different node in each graph
+    blank.sort(key=lambda quad: quad[3] or "")
+    for _, quads in groupby(blank, key=itemgetter(3)):
+        where = UpdateBlock(out, "DELETE WHERE")
+        for s, p, o, g in quads:
+            s = sparql_variable(s) if s.startswith("_:") else s
+            o = sparql_variable(o) if o.startswith("_:") else o
+            where.triple(s, p, o, g)
+        where.close()
+    for quad in iter_patch(paths[ADDED]):
+        inserts.triple(*quad)
+    inserts.close()
+
+
+# -------------------------
+# Delta
+# -------------------------
+def delta_patterns(old_root, new_root, patch, tmp_dir):
+    """
+    Per-pattern delta into patch, each pattern in its named graph.
+    Returns {key: status} (unchanged, changed, added, removed).
+    """
+    index = {}
+    fd, spool_path = tempfile.mkstemp(suffix=".spool", dir=tmp_dir)
+    with open(fd, "w+b") as spool:
+        for key, packaged in iter_pattern_documents(old_root):
+            lines = pattern_lines(packaged)
+            start = spool.tell()
+            spool.write("".join(lines).encode("utf-8"))
+            index[key] = (lines_digest(lines), start, spool.tell())
+
+        def old_lines(key):
+            _, start, end = index.pop(key)
+            spool.seek(start)
+            # split on "\n" only: literals keep U+2028, \x85 and the like raw
+            text = spool.read(end - start).decode("utf-8")
+            return [line + "\n" for line in text.split("\n")[:-1]]
+
+        statuses = {}
+        for key, packaged in iter_pattern_documents(new_root):
+            lines = pattern_lines(packaged)
+            old = index.get(key)
+            if old and old[0] == lines_digest(lines):
+                index.pop(key)
+                statuses[key] = "unchanged"
+                continue
+            statuses[key] = "changed" if old else "added"
+            graph = json_parser.pattern_graph_iri(key)
+            for op, line in diff_sorted(old_lines(key) if old else [], lines):
+                patch.write(op, line, graph)
+
+        for key in list(index):
+            graph = json_parser.pattern_graph_iri(key)
+            for line in old_lines(key):
+                patch.write(REMOVED, line, graph)
+            statuses[key] = "removed"
+    return statuses
+
+
+def delta_global(old_root, new_root, patch, tmp_dir, run_lines=RUN_LINES):
+    """
+    Delta of the unified graph into patch. Returns {key: status} like
+    delta_patterns.
+    """
+    old_digests, old_lines = sorted_build(old_root, tmp_dir, run_lines)
+    new_digests, new_lines = sorted_build(new_root, tmp_dir, run_lines)
+    statuses = {}
+    for key, digest in new_digests.items():
+        old = old_digests.get(key)
+        statuses[key] = "added" if old is None else "unchanged" if old == digest else "changed"
+    statuses.update((key, "removed") for key in old_digests if key not in new_digests)
+
+    if any(status != "unchanged" for status in statuses.values()):
+        for op, line in diff_sorted(old_lines, new_lines):
+            patch.write(op, line)
+    return statuses
+
+
+def compute_delta(old_root, new_root, output_dir, scope="patterns", fmt="nt", run_lines=RUN_LINES):
+    """
+    Write the delta between two builds to output_dir -> (statuses, counts,
+    output paths).
+    """
+    suffix = ".nq" if scope == "patterns" else ".nt"
+    os.makedirs(output_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        patch_dir = output_dir if fmt == "nt" else tmp_dir
+        with PatchWriter(patch_dir, suffix) as patch:
+            if scope == "patterns":
+                statuses = delta_patterns(old_root, new_root, patch, tmp_dir)
+            else:
+                statuses = delta_global(old_root, new_root, patch, tmp_dir, run_lines)
+        if fmt == "nt":
+            return statuses, patch.counts, list(patch.paths.values())
+
+        update_path = os.path.join(output_dir, "update.ru")
+        with open(update_path, "w", encoding="utf-8", newline="\n", buffering=1 << 16) as out:
+            write_sparql_update(patch.paths, out)
+        return statuses, patch.counts, [update_path]
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Compute the triples added and removed between two builds.")
+    parser.add_argument("old", help="previous build: folder of .json files or .jsonl shards")
+    parser.add_argument("new", nargs="?", default=os.path.join(script_dir, "data", "json_data"),
+                        help="current build (default data/json_data)")
+    parser.add_argument("--scope", choices=["patterns", "global"], default="patterns",
+                        help="patterns: per-pattern delta in named graphs (default); "
+                             "global: delta of the unified graph")
+    parser.add_argument("--format", choices=["nt", "sparql"], default="nt",
+                        help="nt: removed/added N-Triples (N-Quads for patterns) patch files (default); "
+                             "sparql: one SPARQL Update request, update.ru")
+    parser.add_argument("--output", default=os.path.join(script_dir, "data", "delta_data"),
+                        help="output folder (default data/delta_data)")
+    parser.add_argument("--run-lines", type=int, default=RUN_LINES,
+                        help=f"lines per sorted run with --scope global (default {RUN_LINES:,})")
+    parser.add_argument("--quiet", action="store_true", help="don't list the changed patterns")
+    args = parser.parse_args()
+
+    for root in (args.old, args.new):
+        if not os.path.isdir(root):
+            sys.exit(f"[ERROR] not a folder: {root}")
+
+    start = time.perf_counter()
+    statuses, counts, paths = compute_delta(args.old, args.new, args.output, args.scope, args.format,
+                                            args.run_lines)
+    elapsed = time.perf_counter() - start
+
+    tally = {}
+    for key, status in statuses.items():
+        tally[status] = tally.get(status, 0) + 1
+        if status != "unchanged" and not args.quiet:
+            print(f"{status.capitalize()}: {key}")
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(tally.items()))
+    print(f"Compared {len(statuses)} patterns ({summary}) in {elapsed:.2f}s: "
+          f"+{counts[ADDED]} -{counts[REMOVED]} {'quads' if args.scope == 'patterns' else 'triples'} "
+          f"-> {', '.join(paths)}")
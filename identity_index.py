@@ -0,0 +1,193 @@
+"""
+identity_index.py
+Corpus-wide index of which pattern minted which ex: IRI.
+
+Every pattern is minted in isolation, so ids such as ex:assistant,
+ex:userproxy or ex:<title>_workflow come out of many files with different
+properties, and a unified graph silently merges unrelated agents.
+
+The index maps IRI -> (owner pattern, fingerprint of its properties, the
+other patterns minting it with their fingerprints) and is persisted next to
+the output (.identity-index), so the first pattern that minted an IRI keeps
+it across runs. A claim is one dict lookup:
+- same owner, or same fingerprint (e.g. ex:llm_gpt-4 minted identically by
+  several patterns): no collision, the IRI is shared
+- different owner and different properties: a collision, resolved by policy
+  - keep:      report only, output unchanged
+  - namespace: move the resource into a per-pattern namespace,
+               ex:assistant -> ex_autogen_chess_game:assistant
+  - hash:      stable per-pattern suffix, ex:assistant -> ex:assistant_1a2b3c4d
+Renames are applied to resource keys and to every object that refers to them.
+
+When an owner's properties change (or the owner disappears), the patterns
+sharing its IRIs are marked stale: their outputs were resolved against the
+old properties, so the build re-resolves them even though their input did
+not change.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+INDEX_NAME = ".identity-index"
+INDEX_VERSION = 2
+POLICIES = ("keep", "namespace", "hash")
+
+NAMESPACE_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def resource_fingerprint(properties):
+    text = json.dumps(sorted(properties.items()), ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def pattern_claims(resources):
+    # [(iri, fingerprint)] for every resource a pattern minted, in mint order
+    return [(iri, resource_fingerprint(props)) for iri, props in resources.items()]
+
+
+def pattern_key_for(manifest_key):
+    # "autogen/chess_game.txt" -> "autogen/chess_game"
+    return os.path.splitext(manifest_key)[0]
+
+
+class IdentityIndex:
+    """
+    Persisted IRI -> [owner pattern, fingerprint, {sharer: fingerprint}] map.
+    resolve() claims a pattern's IRIs and returns the renames its policy
+    asks for; stale holds the patterns that must be resolved again;
+    save() writes the index back.
+    """
+
+    def __init__(self, output_root, policy="keep", name=INDEX_NAME):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown identity policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.path = os.path.join(output_root, name)
+        self.policy = policy
+        self.iris = {}
+        self.stale = set()
+        self.collisions = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == INDEX_VERSION:
+                self.iris = stored.get("iris", {})
+                self.stale = set(stored.get("stale", []))
+        except (OSError, ValueError):
+            pass
+        # pattern -> IRIs it shares with another owner
+        self.shared = {}
+        for iri, (_, _, sharers) in self.iris.items():
+            for pattern_key in sharers:
+                self.shared.setdefault(pattern_key, set()).add(iri)
+
+    def claim(self, pattern_key, iri, fingerprint):
+        """
+        Record that pattern_key minted iri; returns the current owner when
+        this is a collision, None otherwise.
+        """
+        entry = self.iris.get(iri)
+        if entry is None:
+            self.iris[iri] = [pattern_key, fingerprint, {}]
+            return None
+        owner, owner_fingerprint, sharers = entry
+        if owner == pattern_key:
+            if fingerprint != owner_fingerprint:
+                entry[1] = fingerprint
+                # sharers were resolved against the old properties
+                self.stale.update(sharers)
+            return None
+        sharers[pattern_key] = fingerprint
+        self.shared.setdefault(pattern_key, set()).add(iri)
+        if owner_fingerprint == fingerprint:
+            return None
+        return owner
+
+    def resolve(self, pattern_key, claims):
+        # {old_iri: new_iri} for the colliding IRIs of one pattern
+        self.stale.discard(pattern_key)
+        # forget the IRIs this pattern shared before but no longer mints
+        minted = {iri for iri, _ in claims}
+        for iri in self.shared.pop(pattern_key, set()) - minted:
+            entry = self.iris.get(iri)
+            if entry:
+                entry[2].pop(pattern_key, None)
+        renames = {}
+        for iri, fingerprint in claims:
+            owner = self.claim(pattern_key, iri, fingerprint)
+            if owner is None:
+                continue
+            self.collisions.append((iri, pattern_key, owner))
+            if self.policy != "keep":
+                renamed = self.rename(pattern_key, iri)
+                if renamed != iri:
+                    renames[iri] = renamed
+        return renames
+
+    def rename(self, pattern_key, iri):
+        prefix, sep, local = iri.partition(":")
+        if self.policy == "hash":
+            suffix = hashlib.sha1(pattern_key.encode("utf-8")).hexdigest()[:8]
+            return f"{iri}_{suffix}"
+        if prefix == "ex" and sep:
+            return f"{namespace_prefix(pattern_key)}:{local}"
+        return iri
+
+    def forget_missing(self, live_patterns):
+        """
+        Drop claims of patterns that no longer exist, so their IRIs are free
+        again; the remaining sharers of a freed IRI become stale.
+        """
+        live = set(live_patterns)
+        for iri, (owner, _, sharers) in list(self.iris.items()):
+            for pattern_key in [k for k in sharers if k not in live]:
+                del sharers[pattern_key]
+            if owner not in live:
+                del self.iris[iri]
+                self.stale.update(sharers)
+        self.shared = {k: iris for k, iris in self.shared.items() if k in live}
+        self.stale &= live
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": INDEX_VERSION, "iris": self.iris, "stale": sorted(self.stale)}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def report(self, limit=20):
+        for iri, pattern_key, owner in self.collisions[:limit]:
+            print(f"[COLLISION] {iri}: minted by {pattern_key}, owned by {owner}")
+        if len(self.collisions) > limit:
+            print(f"[COLLISION] ... (+{len(self.collisions) - limit})")
+        action = "kept" if self.policy == "keep" else f"renamed ({self.policy})"
+        print(f"Identity index: {len(self.iris)} IRIs, {len(self.collisions)} collisions {action}")
+
+
+def namespace_prefix(pattern_key):
+    return "ex_" + NAMESPACE_CHARS.sub("_", pattern_key)
+
+
+def namespace_uri(ex_uri, pattern_key):
+    # http://.../instances# -> http://.../instances/autogen/chess_game#
+    return f"{ex_uri.rstrip('#/')}/{pattern_key}#"
+
+
+def apply_renames(packaged, renames, pattern_key, policy):
+    """
+    Rewrite a prefixes/resources package in place: renamed resource keys,
+    objects pointing at them, and (namespace policy) the pattern's prefix.
+    """
+    if not renames:
+        return packaged
+    packaged["resources"] = {
+        renames.get(iri, iri): {p: renames.get(o, o) if isinstance(o, str) else o for p, o in props.items()}
+        for iri, props in packaged["resources"].items()
+    }
+    if policy == "namespace":
+        prefixes = dict(packaged.get("prefixes") or {})
+        prefixes[namespace_prefix(pattern_key)] = namespace_uri(prefixes.get("ex", ""), pattern_key)
+        packaged["prefixes"] = prefixes
+    return packaged
@@ -1,86 +1,417 @@
+import argparse
+import io
 import json
 import os
+import re
+from urllib.parse import quote
 
-def to_turtle_value(value):
+import build_manifest
+import jsonl_shards
+import run_report
+from build_manifest import BuildManifest, bytes_digest, converter_digest, file_digest, manifest_key
+from jsonl_shards import SHARD_SUFFIX, decode_record, iter_pattern_documents, iter_shard_lines
+from run_report import Timed, graph_size, open_report
+
+# every repo module the output depends on (see converter_digest)
+CODE_PATHS = [os.path.abspath(__file__), jsonl_shards.__file__, build_manifest.__file__, run_report.__file__]
+
+# -------------------------
+# Terms
+# -------------------------
+# local part of a prefixed name that can be written without escapes
+PN_LOCAL = re.compile(r"(?:[\w%:](?:[\w.%:-]*[\w%:-])?)?")
+
+# precomputed escapes for the control characters a short literal cannot hold
+# raw; " and \ are handled by str.replace, everything else (UTF-8 included) is kept
+CONTROL_ESCAPES = {chr(c): f"\\u{c:04X}" for c in (*range(0x20), 0x7f)}
+CONTROL_ESCAPES.update({"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"})
+CONTROLS = re.compile("[\x00-\x1f\x7f]")
+
+
+def escape_control(m):
+    return CONTROL_ESCAPES[m.group()]
+
+
+def is_curie(value, prefixes):
+    # prefix:local with a declared prefix (or a _:blank node label)
+    if " " in value:
+        return False
+    prefix, sep, local = value.partition(":")
+    if not sep or prefix not in prefixes and prefix != "_":
+        return False
+    # isidentifier() covers the usual names without running the regex
+    return local.isidentifier() or PN_LOCAL.fullmatch(local) is not None
+
+
+def turtle_literal(text):
     """
-    Decide whether a value is a URI (prefix:value) or string literal.
+    Quote a string as a Turtle literal: "short", or triple-quoted when it
+    spans lines.
     """
-    if isinstance(value, str):
-        if not value.startswith("http") and ":" in value and " " not in value:
-            # likely CURIE (prefix:value)
-            return value
+    printable = text.isprintable()
+    if printable and '"' not in text and "\\" not in text:
+        return f'"{text}"'
+    text = text.replace("\\", "\\\\").replace('"', '\\"')
+    if printable:
+        return f'"{text}"'
+    if "\n" in text:
+        # a long literal only needs " and \ escaped (so nothing inside can close
+        # it early); \r too, or text-mode reading would fold \r\n into \n
+        text = text.replace("\r", "\\r")
+        return f'"""{text}"""'
+    return f'"{CONTROLS.sub(escape_control, text)}"'
 
-    return json.dumps(str(value))
 
+def to_turtle_value(value, prefixes, lang=None):
+    """
+    Decide whether a value is a URI (declared prefix:value) or string
+    literal, tagged @lang when given.
+    """
+    value = str(value)
+    if is_curie(value, prefixes):
+        return value
+    literal = turtle_literal(value)
+    return f"{literal}@{lang}" if lang else literal
 
-def convert_json_to_ttl(json_data):
-    ttl_lines = []
 
-    # --- Prefixes ---
-    if "prefixes" in json_data:
-        for prefix, uri in json_data["prefixes"].items():
+LANG_TAG = re.compile(r"[A-Za-z]+(?:-[A-Za-z0-9]+)*")
+
+
+def parse_langs(specs):
+    """
+    --lang values -> {predicate: tag}; a bare TAG (key None) applies to
+    every other predicate.
+    """
+    langs = {}
+    for spec in specs or ():
+        pred, sep, tag = spec.rpartition("=")
+        if not LANG_TAG.fullmatch(tag):
+            raise ValueError(f"invalid language tag in {spec!r}")
+        langs[pred if sep else None] = tag.lower()
+    return langs
+
+
+def literal_lang(langs, pred):
+    return langs.get(pred, langs.get(None)) if langs else None
+
+
+class TurtleWriter:
+    """
+    Streams Turtle to a text file handle as resources are iterated.
+    Items are separated by newlines exactly like the former "\n".join over a
+    ttl_lines list, so the output is byte-identical without ever holding it.
+    langs ({predicate: tag}, see parse_langs) tags the string literals.
+    """
+
+    def __init__(self, out, langs=None):
+        self.out = out
+        self.langs = langs
+        # prefixes declared so far; values only become CURIEs against these
+        self.declared = {}
+        self._started = False
+
+    def _separator(self):
+        if self._started:
+            self.out.write("\n")
+        self._started = True
+
+    def line(self, text):
+        self._separator()
+        self.out.write(text)
+
+    def prefixes(self, prefixes):
+        self.declared.update(prefixes)
+        for prefix, uri in prefixes.items():
             if prefix == "":
-                ttl_lines.append(f"@prefix : <{uri}> .")
+                self.line(f"@prefix : <{uri}> .")
             else:
-                ttl_lines.append(f"@prefix {prefix}: <{uri}> .")
-        ttl_lines.append("")  # newline
+                self.line(f"@prefix {prefix}: <{uri}> .")
+        self.line("")  # newline
+
+    def banner(self, title):
+        self.line("### ================================")
+        self.line(f"### {title}")
+        self.line("### ================================")
+
+    def subject(self, subject, pairs):
+        """
+        Write one subject block; pairs is an iterable of (predicate, object).
+        A predicate may repeat (one line per object).
+        """
+        self.line(f"\n{subject}")
+        self._separator()
+        write = self.out.write
+        declared, langs = self.declared, self.langs
+        first = True
+        for pred, obj in pairs:
+            if not first:
+                write(" ;\n")
+            first = False
+            if pred == "rdf:type":
+                write(f"    a {obj}")
+            else:
+                write(f"    {pred} {to_turtle_value(obj, declared, literal_lang(langs, pred))}")
+        write(" .\n")
+
+
+def write_ttl(json_data, out, langs=None):
+    writer = TurtleWriter(out, langs)
+
+    # --- Prefixes ---
+    if "prefixes" in json_data:
+        writer.prefixes(json_data["prefixes"])
 
     # --- Resources ---
-    ttl_lines.append("### ================================")
-    ttl_lines.append("### Resources")
-    ttl_lines.append("### ================================")
+    writer.banner("Resources")
 
     resources = json_data.get("resources", {})
 
     for subject, properties in resources.items():
-        ttl_lines.append(f"\n{subject}")
+        writer.subject(subject, properties.items())
 
-        # Convert each predicate/object
-        preds = []
-        for pred, obj in properties.items():
-            if pred == "rdf:type":
-                preds.append(f"    a {obj}")
-            else:
-                preds.append(f"    {pred} {to_turtle_value(obj)}")
 
-        ttl_lines.append(" ;\n".join(preds) + " .\n")
+def convert_json_to_ttl(json_data, langs=None):
+    buffer = io.StringIO()
+    write_ttl(json_data, buffer, langs)
+    return buffer.getvalue()
+
 
-    return "\n".join(ttl_lines)
+def write_ttl_file(json_data, output_path, langs=None):
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        write_ttl(json_data, f, langs)
 
 
-def convert_file(input_path, output_path):
+def convert_file(input_path, output_path, langs=None):
     with open(input_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    ttl_content = convert_json_to_ttl(data)
+    write_ttl_file(data, output_path, langs)
+    return data
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(ttl_content)
 
+# -------------------------
+# N-Triples / N-Quads (bulk-load output)
+# -------------------------
+PATTERN_GRAPH_BASE = "http://www.w3id.org/agentic-ai/patterns/"
+LINE_FORMATS = {"nt": ".nt", "nq": ".nq"}
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
 
-def process_folder(input_root, output_root):
+
+def expand_curie(curie, prefixes):
+    """
+    prefix:local -> <full IRI> using the document's prefixes block;
+    blank nodes (_:label) are kept as they are.
+    Raises ValueError for an undeclared prefix.
+    """
+    prefix, _, local = curie.partition(":")
+    if prefix == "_":
+        return curie
+    if prefix not in prefixes:
+        raise ValueError(f"undeclared prefix in {curie!r}")
+    return f"<{prefixes[prefix]}{local}>"
+
+
+def nt_literal(value):
+    # json escapes (\" \\ \n \t \uXXXX ...) are all valid N-Triples escapes
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def nt_object(value, prefixes, lang=None):
+    # same CURIE-or-literal decision as the Turtle output
+    value = str(value)
+    if is_curie(value, prefixes):
+        return expand_curie(value, prefixes)
+    return f"{nt_literal(value)}@{lang}" if lang else nt_literal(value)
+
+
+def pattern_graph_iri(key):
+    # named graph for one pattern, from its "framework/file_name" key
+    return f"<{PATTERN_GRAPH_BASE}{quote(key)}>"
+
+
+def iter_ntriples(json_data, graph=None, langs=None):
+    """
+    Yield one N-Triples line per triple (N-Quads when graph is an IRI term).
+    """
+    prefixes = json_data.get("prefixes", {})
+    tail = f" {graph} .\n" if graph else " .\n"
+    for subject, properties in json_data.get("resources", {}).items():
+        s = expand_curie(subject, prefixes)
+        for pred, obj in properties.items():
+            o = nt_object(obj, prefixes, literal_lang(langs, pred))
+            yield f"{s} {expand_curie(pred, prefixes)} {o}{tail}"
+
+
+def convert_json_to_nt(json_data, graph=None):
+    return "".join(iter_ntriples(json_data, graph))
+
+
+class ChunkedLineWriter:
+    """
+    Writes lines into part-00000.nt, part-00001.nt, ... so that no chunk grows
+    past max_bytes (a single longer line still gets a chunk of its own).
+    Chunks hold whole lines only, so they can be bulk-loaded in parallel.
+    """
+
+    def __init__(self, output_dir, suffix, max_bytes=DEFAULT_CHUNK_BYTES):
+        self.output_dir = output_dir
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.paths = []
+        self._file = None
+        self._size = 0
+
+    def _roll(self):
+        self.close()
+        path = os.path.join(self.output_dir, f"part-{len(self.paths):05d}{self.suffix}")
+        self.paths.append(path)
+        self._file = open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 16)
+        self._size = 0
+
+    def write(self, line):
+        size = len(line.encode("utf-8"))
+        if self._file is None or (self._size and self._size + size > self.max_bytes):
+            self._roll()
+        self._file.write(line)
+        self._size += size
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def process_folder_lines(input_root, output_dir, fmt="nt", chunk_bytes=DEFAULT_CHUNK_BYTES, report=None,
+                         langs=None):
+    """
+    Stream every pattern (pretty JSON or jsonl shards) into size-bounded
+    N-Triples (fmt="nt") or N-Quads (fmt="nq", one named graph per pattern)
+    chunk files.
+    """
+    suffix = LINE_FORMATS[fmt]
+    os.makedirs(output_dir, exist_ok=True)
+    # chunks from an earlier, larger run would otherwise be loaded too
+    for name in os.listdir(output_dir):
+        if name.startswith("part-") and name.endswith(suffix):
+            os.remove(os.path.join(output_dir, name))
+
+    with ChunkedLineWriter(output_dir, suffix, chunk_bytes) as out:
+        for key, data in iter_pattern_documents(input_root):
+            graph = pattern_graph_iri(key) if fmt == "nq" else None
+            _, wall, cpu = Timed(write_lines)(out, iter_ntriples(data, graph, langs))
+            if report:
+                report.file(key, "built", graph_size(data), wall, cpu, pattern=key)
+            print(f"Converted {key} → {out.paths[-1] if out.paths else output_dir}")
+
+    print(f"Wrote {len(out.paths)} {fmt} chunk(s) to {output_dir}")
+    return out.paths
+
+
+def write_lines(out, lines):
+    for line in lines:
+        out.write(line)
+
+
+def process_folder(input_root, output_root, force=False, report=None, langs=None):
     os.makedirs(output_root, exist_ok=True)
+    config = {"langs": sorted(langs.items(), key=str)} if langs else None
+    manifest = BuildManifest(output_root, converter_digest(CODE_PATHS, config))
+
+    try:
+        for root, dirs, files in os.walk(input_root):
+            for file in files:
+                if file.endswith(".json"):
+                    input_path = os.path.join(root, file)
+
+                    # Preserve subfolder structure
+                    relative_path = os.path.relpath(root, input_root)
+                    output_dir = os.path.join(output_root, relative_path)
+                    os.makedirs(output_dir, exist_ok=True)
 
-    for root, dirs, files in os.walk(input_root):
-        for file in files:
-            if file.endswith(".json"):
-                input_path = os.path.join(root, file)
+                    output_name = file.replace(".json", ".ttl")
+                    output_path = os.path.join(output_dir, output_name)
 
-                # Preserve subfolder structure
-                relative_path = os.path.relpath(root, input_root)
-                output_dir = os.path.join(output_root, relative_path)
-                os.makedirs(output_dir, exist_ok=True)
+                    key = manifest_key(input_path, input_root)
+                    digest = file_digest(input_path)
+                    if not force and manifest.is_fresh(key, digest):
+                        print(f"Unchanged {input_path} → {output_path}")
+                        if report:
+                            report.file(key, "unchanged")
+                        continue
 
-                output_name = file.replace(".json", ".ttl")
-                output_path = os.path.join(output_dir, output_name)
+                    data, wall, cpu = Timed(convert_file)(input_path, output_path, langs)
+                    manifest.record(key, digest, {output_path: file_digest(output_path)})
+                    if report:
+                        report.file(key, "built", graph_size(data), wall, cpu)
+                    print(f"Converted {input_path} → {output_path}")
 
-                convert_file(input_path, output_path)
-                print(f"Converted {input_path} → {output_path}")
+                elif file.endswith(SHARD_SUFFIX):
+                    # jsonl shard: one .ttl per record, tracked per record
+                    input_path = os.path.join(root, file)
+                    output_dir = os.path.join(output_root, os.path.relpath(root, input_root))
+                    os.makedirs(output_dir, exist_ok=True)
+
+                    prefixes = None
+                    for header, line in iter_shard_lines(input_path):
+                        if prefixes is None:
+                            prefixes = json.loads(header).get("prefixes", {})
+                        name, data = decode_record(header, line, prefixes)
+                        output_path = os.path.join(output_dir, name + ".ttl")
+
+                        key = f"{manifest_key(input_path, input_root)}#{name}"
+                        digest = bytes_digest(header + line)
+                        if not force and manifest.is_fresh(key, digest):
+                            print(f"Unchanged {input_path}#{name} → {output_path}")
+                            if report:
+                                report.file(key, "unchanged")
+                            continue
+
+                        _, wall, cpu = Timed(write_ttl_file)(data, output_path, langs)
+                        manifest.record(key, digest, {output_path: file_digest(output_path)})
+                        if report:
+                            report.file(key, "built", graph_size(data), wall, cpu)
+                        print(f"Converted {input_path}#{name} → {output_path}")
+    finally:
+        manifest.save()
 
 
 if __name__ == "__main__":
     import os
+    parser = argparse.ArgumentParser(description="Convert prefixes/resources JSON files to Turtle.")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every file, ignoring the build manifest")
+    parser.add_argument("--format", choices=["ttl", "nt", "nq"], default="ttl",
+                        help="ttl: one Turtle file per pattern (default); nt/nq: N-Triples / "
+                             "N-Quads bulk-load chunks in data/nt_data or data/nq_data")
+    parser.add_argument("--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES,
+                        help="maximum size of one nt/nq chunk file (default 64 MiB)")
+
+    parser.add_argument("--input", default=None,
+                        help="folder of .json files and/or .jsonl shards (default data/json_data)")
+    parser.add_argument("--report", metavar="FILE",
+                        help="append a JSON Lines run report (per-file entities, triples, wall/CPU time) to FILE")
+    parser.add_argument("--lang", action="append", metavar="[PRED=]TAG",
+                        help="language tag for string literals: TAG for all of them, or PRED=TAG "
+                             "(e.g. dcterms:description=en) for one predicate; repeatable")
+    args = parser.parse_args()
+    try:
+        langs = parse_langs(args.lang)
+    except ValueError as e:
+        parser.error(str(e))
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    input_root = os.path.join(script_dir, "data", "json_data")
-    output_root = os.path.join(script_dir, "data", "ttl_data")
-    process_folder(input_root, output_root)
+    input_root = args.input or os.path.join(script_dir, "data", "json_data")
+    with open_report(args.report, "json-parser") as report:
+        if args.format == "ttl":
+            output_root = os.path.join(script_dir, "data", "ttl_data")
+            process_folder(input_root, output_root, force=args.force, report=report, langs=langs)
+        else:
+            output_dir = os.path.join(script_dir, "data", f"{args.format}_data")
+            process_folder_lines(input_root, output_dir, args.format, args.chunk_bytes, report=report,
+                                 langs=langs)
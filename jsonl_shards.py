@@ -0,0 +1,134 @@
+"""
+jsonl_shards.py
+Compact intermediate format: JSON Lines shards of prefixes/resources packages.
+
+Layout of one shard (shard-00000.jsonl, ...), one JSON document per line:
+- line 1: {"prefixes": {...}}                       prefix table shared by the shard
+- then:   {"pattern": "chess_game", "resources": {...}}   one line per pattern
+A pattern whose prefixes differ from the shard table carries its own
+"prefixes" key; an "error" key is kept as-is.
+
+analyzed-parser.py writes shards with --format jsonl; json-parser.py and the
+other tools read them with iter_shard_records / iter_pattern_documents.
+"""
+
+import json
+import os
+
+SHARD_SUFFIX = ".jsonl"
+DEFAULT_SHARD_SIZE = 1000
+COMPACT = (",", ":")
+
+
+def encode_record(name, packaged, shard_prefixes, default=None):
+    record = {"pattern": name}
+    for key, value in packaged.items():
+        if key == "prefixes" and value == shard_prefixes:
+            continue
+        record[key] = value
+    return json.dumps(record, ensure_ascii=False, separators=COMPACT, default=default)
+
+
+class ShardWriter:
+    """
+    Appends encoded records to shard-NNNNN.jsonl files in output_dir,
+    starting a new shard every shard_size records.
+    """
+
+    def __init__(self, output_dir, prefixes, shard_size=DEFAULT_SHARD_SIZE):
+        self.output_dir = output_dir
+        self.prefixes = prefixes
+        self.shard_size = shard_size
+        self.paths = []
+        self._file = None
+        self._count = 0
+
+    def _roll(self):
+        self.close()
+        path = os.path.join(self.output_dir, f"shard-{len(self.paths):05d}{SHARD_SUFFIX}")
+        self.paths.append(path)
+        self._file = open(path, "w", encoding="utf-8", newline="\n", buffering=1 << 16)
+        self._file.write(json.dumps({"prefixes": self.prefixes}, ensure_ascii=False, separators=COMPACT))
+        self._file.write("\n")
+        self._count = 0
+
+    def write(self, line):
+        if self._file is None or self._count >= self.shard_size:
+            self._roll()
+        self._file.write(line)
+        self._file.write("\n")
+        self._count += 1
+        return self.paths[-1]
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def remove_shards(output_dir):
+    # shards are rewritten as a whole; stale ones from a larger run must go
+    if os.path.isdir(output_dir):
+        for name in os.listdir(output_dir):
+            if name.startswith("shard-") and name.endswith(SHARD_SUFFIX):
+                os.remove(os.path.join(output_dir, name))
+
+
+def iter_shard_lines(path):
+    """
+    Yield (header_line, record_line) for every pattern in a shard, unparsed.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline()
+        for line in f:
+            if line.strip():
+                yield header, line
+
+
+def decode_record(header_line, record_line, prefixes=None):
+    """
+    Turn one shard line back into (pattern_name, packaged) with the same
+    shape as a pretty .json file: {"prefixes": ..., "resources": ..., ...}.
+    """
+    if prefixes is None:
+        prefixes = json.loads(header_line).get("prefixes", {})
+    record = json.loads(record_line)
+    name = record.pop("pattern")
+    packaged = {"prefixes": record.pop("prefixes", prefixes)}
+    packaged.update(record)
+    return name, packaged
+
+
+def iter_shard_records(path):
+    # (pattern_name, packaged) for every record, one line in memory at a time
+    prefixes = None
+    for header, line in iter_shard_lines(path):
+        if prefixes is None:
+            prefixes = json.loads(header).get("prefixes", {})
+        yield decode_record(header, line, prefixes)
+
+
+def iter_pattern_documents(input_root):
+    """
+    (pattern_key, packaged) for every pattern under input_root, from pretty
+    .json files and .jsonl shards alike, sorted by folder then file.
+    pattern_key is "framework/file_name" (no extension).
+    """
+    for root, dirs, files in os.walk(input_root):
+        dirs.sort()
+        rel_dir = os.path.relpath(root, input_root).replace(os.sep, "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            if file.endswith(".json"):
+                with open(path, "r", encoding="utf-8") as f:
+                    yield prefix + file[:-len(".json")], json.load(f)
+            elif file.endswith(SHARD_SUFFIX):
+                for name, packaged in iter_shard_records(path):
+                    yield prefix + name, packaged
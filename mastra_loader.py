@@ -0,0 +1,145 @@
+"""
+mastra_loader.py
+Structured loader for Mastra agent definitions (data/raw_data/mastraai/*.json, *.yaml).
+
+Streams the documents of a definition file straight into the entity records
+normalize_mastraai reads, without an analyzed .txt in between:
+- a "pattern" entity carrying the system name
+- one "agent_N" entity per agent, with name / role / instructions / model
+  (agent_N is also the id of an agent without a name, so it must stay a
+  valid prefixed-name local)
+
+A file may hold several documents (YAML "---" bundles, JSON Lines or
+concatenated JSON). YAML and JSON Lines are parsed one document at a time,
+so a large bundle is never fully in memory; a .json file is read whole and
+decoded with json.loads. Only the extracted records are kept. A document with an
+"agents" list contributes its agents; a document that is itself an agent
+(name plus role / instructions / model) becomes one agent.
+
+PyYAML is only needed for .yaml / .yml files.
+"""
+
+import json
+import os
+import re
+
+from pipeline import analyzed_parser
+
+EntityRecord = analyzed_parser.EntityRecord
+SourceRef = analyzed_parser.SourceRef
+
+AGENT_KEYS = ("name", "role", "instructions", "model")
+YAML_SUFFIXES = (".yaml", ".yml")
+JSON_SUFFIXES = (".json", ".jsonl")
+WHITESPACE = re.compile(r"\s*")
+
+
+# -------------------------
+# Document streams
+# -------------------------
+def iter_yaml_documents(f):
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("PyYAML is required to load Mastra .yaml definitions (pip install pyyaml)") from None
+    # the C loader is much faster on large bundles when libyaml is available
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    for doc in yaml.load_all(f, Loader=loader):
+        if doc is not None:
+            yield doc
+
+
+def iter_json_lines(f):
+    # JSON Lines: one document per non-blank line
+    for n, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {n}: {e}") from None
+
+
+def iter_json_documents(f):
+    """
+    Yield the JSON values of a stream: normally one document, decoded with
+    json.loads; values written one after another (concatenated JSON) are
+    then decoded in turn from the same text, each exactly once.
+    """
+    text = f.read()
+    try:
+        doc = json.loads(text)
+    except json.JSONDecodeError as e:
+        if e.msg != "Extra data":
+            raise
+    else:
+        yield doc
+        return
+
+    decoder = json.JSONDecoder()
+    end = 0
+    while True:
+        pos = WHITESPACE.match(text, end).end()
+        if pos == len(text):
+            return
+        doc, end = decoder.raw_decode(text, pos)
+        yield doc
+
+
+def iter_documents(path):
+    suffix = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8") as f:
+        if suffix in YAML_SUFFIXES:
+            yield from iter_yaml_documents(f)
+        elif suffix == ".jsonl":
+            yield from iter_json_lines(f)
+        else:
+            yield from iter_json_documents(f)
+
+
+# -------------------------
+# Records
+# -------------------------
+def agent_record(n, agent):
+    attrs = {k: str(agent[k]) for k in AGENT_KEYS if agent.get(k) is not None}
+    return EntityRecord(f"agent_{n}", "Agent", "agento:Agent", attrs, "", ())
+
+
+def is_agent(doc):
+    return "name" in doc and any(k in doc for k in AGENT_KEYS[1:])
+
+
+def load_mastra_pattern(path):
+    """
+    Build the intermediate structure convert_pattern_to_autogen returns for
+    a Mastra definition file, one document at a time.
+    """
+    entities = []
+    system = None
+    description = ""
+    n_agents = 0
+    for doc in iter_documents(path):
+        if not isinstance(doc, dict):
+            continue
+        if "agents" in doc or not is_agent(doc):
+            if "name" in doc and system is None:
+                system = EntityRecord("pattern", "System", "", {"name": str(doc["name"])}, "", ())
+                entities.append(system)
+            description = description or str(doc.get("description") or "")
+            agents = doc.get("agents") or []
+        else:
+            agents = [doc]
+        for agent in agents:
+            if isinstance(agent, dict):
+                n_agents += 1
+                entities.append(agent_record(n_agents, agent))
+
+    return {
+        "framework": "MastraAI",
+        "file_name": os.path.basename(path),
+        "pattern_type": "",
+        "description": description,
+        "entities": entities,
+        "ontologyRelationalProperties": [],
+        "newOntologyTerms": {},
+        "_source": SourceRef(path, 0, None),
+    }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+End-to-end build: analyzed pattern .txt -> Turtle, in memory, one file at a time.
+
+Chains analyzed-parser.process_file_text_to_json straight into
+json-parser.convert_json_to_ttl, so no intermediate JSON has to be written
+and read back. The JSON can still be written as a side artifact (--json).
+
+The two stage scripts are also exposed here as importable modules
+(pipeline.analyzed_parser, pipeline.json_parser) for the other tools.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from functools import partial
+
+from build_manifest import BuildManifest, bytes_digest, converter_digest, file_digest, manifest_key
+from run_report import Timed, graph_size, open_report
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, module_name):
+    # the stage scripts have dashes in their names, so load them by path
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    # registered before exec so worker processes can unpickle its functions
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+analyzed_parser = load_script("analyzed-parser.py", "analyzed_parser")
+json_parser = load_script("json-parser.py", "json_parser")
+
+PIPELINE_MANIFEST = ".pipeline-manifest"
+
+
+# -------------------------
+# Per-file build
+# -------------------------
+def build_file(input_path, with_json=False, generated="expand"):
+    """
+    Convert one analyzed .txt all the way to Turtle.
+    Returns (ttl_text, json_text or None, error_message, size); parse
+    failures yield the same empty fallback package analyzed-parser writes.
+    size is (entities, triples) for run reports.
+    generated="lazy" keeps generated goals/tasks as templates until written.
+    """
+    with open(input_path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    error = None
+    try:
+        packaged = analyzed_parser.process_file_text_to_json(text, input_path, generated)
+    except Exception as e:
+        error = f"[ERROR] Failed parsing {input_path}: {e}"
+        packaged = {"prefixes": analyzed_parser.DEFAULT_PREFIXES, "resources": {}, "error": str(e)}
+
+    json_text = None
+    if with_json:
+        json_text = json.dumps(packaged, ensure_ascii=False, indent=2, default=analyzed_parser.json_default)
+    return json_parser.convert_json_to_ttl(packaged), json_text, error, graph_size(packaged)
+
+
+def iter_build_jobs(input_root, ttl_root, json_root=None):
+    # (input_path, ttl_path, json_path or None) for every .txt, sorted by folder then file
+    for root, dirs, files in os.walk(input_root):
+        # same order as analyzed-parser's iter_input_files, on every machine
+        dirs.sort()
+        for file in sorted(files):
+            if file.endswith(".txt"):
+                rel_path = os.path.relpath(root, input_root)
+                stem = file[:-len(".txt")]
+                ttl_dir = os.path.join(ttl_root, rel_path)
+                os.makedirs(ttl_dir, exist_ok=True)
+                json_path = None
+                if json_root:
+                    json_dir = os.path.join(json_root, rel_path)
+                    os.makedirs(json_dir, exist_ok=True)
+                    json_path = os.path.join(json_dir, stem + ".json")
+                yield os.path.join(root, file), os.path.join(ttl_dir, stem + ".ttl"), json_path
+
+
+def write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def process_folder(input_root, ttl_root, json_root=None, workers=1, force=False, generated="expand", report=None):
+    config = {"json": bool(json_root)}
+    if generated != "expand":
+        config["generated"] = generated
+    # both stages' modules, each once
+    code = dict.fromkeys([os.path.abspath(__file__), *analyzed_parser.CODE_PATHS, *json_parser.CODE_PATHS])
+    converter = converter_digest(code, config)
+    manifest = BuildManifest(ttl_root, converter, name=PIPELINE_MANIFEST)
+
+    jobs = []
+    for input_path, ttl_path, json_path in iter_build_jobs(input_root, ttl_root, json_root):
+        key = manifest_key(input_path, input_root)
+        digest = file_digest(input_path)
+        fresh = not force and manifest.is_fresh(key, digest)
+        jobs.append((input_path, ttl_path, json_path, key, digest, fresh))
+    inputs = [job[0] for job in jobs if not job[5]]
+
+    worker = Timed(partial(build_file, with_json=bool(json_root), generated=generated))
+    results, pool = analyzed_parser.start_map(worker, inputs, workers)
+    try:
+        for input_path, ttl_path, json_path, key, digest, fresh in jobs:
+            if fresh:
+                print(f"Unchanged: {input_path} -> {ttl_path}")
+                if report:
+                    report.file(key, "unchanged")
+                continue
+
+            (ttl_text, json_text, error, size), wall, cpu = next(results)
+            if error:
+                print(error)
+
+            outputs = {ttl_path: bytes_digest(ttl_text)}
+            write_text(ttl_path, ttl_text)
+            if json_path:
+                write_text(json_path, json_text)
+                outputs[json_path] = bytes_digest(json_text)
+
+            if error:
+                manifest.forget(key)
+            else:
+                manifest.record(key, digest, outputs)
+            if report:
+                report.file(key, "error" if error else "built", size, wall, cpu)
+
+            print(f"Built: {input_path} -> {ttl_path}")
+    finally:
+        if pool:
+            pool.shutdown()
+        manifest.save()
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build Turtle straight from analyzed pattern .txt files.")
+    parser.add_argument("--json", action="store_true",
+                        help="also write the intermediate JSON to data/json_data")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU, default 1 = serial)")
+    parser.add_argument("--force", action="store_true",
+                        help="rebuild every file, ignoring the build manifest")
+    parser.add_argument("--generated-goals", choices=analyzed_parser.GENERATED_MODES, default="expand",
+                        help="auto-generated goal/task per agent: expand (default), lazy, omit or shared "
+                             "(see analyzed-parser.py)")
+    parser.add_argument("--report", metavar="FILE",
+                        help="append a JSON Lines run report (per-file entities, triples, wall/CPU time) to FILE")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    input_root = os.path.join(SCRIPT_DIR, "data", "analyzed_data")
+    ttl_root = os.path.join(SCRIPT_DIR, "data", "ttl_data")
+    json_root = os.path.join(SCRIPT_DIR, "data", "json_data") if args.json else None
+    with open_report(args.report, "pipeline") as report:
+        process_folder(input_root, ttl_root, json_root, workers=workers, force=args.force,
+                       generated=args.generated_goals, report=report)
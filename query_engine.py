@@ -0,0 +1,804 @@
+#!/usr/bin/env python3
+"""
+query_engine.py
+Small SPARQL-style query engine over the converted graphs (triple_store).
+
+Supported subset:
+    PREFIX p: <iri>                      (the store's own prefixes need no PREFIX)
+    SELECT [DISTINCT] ?v ... | *         with (COUNT([DISTINCT] ?v|*) AS ?n),
+                                         (SAMPLE/MIN/MAX(?v) AS ?x),
+                                         (GROUP_CONCAT(?v; SEPARATOR=", ") AS ?x)
+    WHERE {
+        ?s :p ?o ; :q "text" , ?x .      triple patterns, "a" for rdf:type
+        GRAPH ?g { ... }                 ?g binds the pattern the triples came from
+        FILTER(expr)                     || && ! = != < > <= >=, CONTAINS, REGEX,
+                                         STRSTARTS, STRENDS, STRBEFORE, STRAFTER,
+                                         STR, LCASE, UCASE, STRLEN, BOUND,
+                                         isIRI, isLiteral
+        BIND(expr AS ?v)                 evaluated once the triple patterns are joined
+    }
+    GROUP BY ?v ...   ORDER BY [ASC|DESC](?v) ...   LIMIT n   OFFSET n
+
+Execution:
+- Triple patterns are ordered greedily by estimated result size, from exact
+  index cardinalities (TripleStore.count_ids) scaled down for the variables
+  already bound; patterns connected to the bound variables go first.
+- Each step is an index nested-loop join (one lookup per binding) or, when
+  the bindings outnumber the pattern's own matches or nothing is shared, a
+  hash join against a single scan of the pattern.
+- FILTERs run as soon as their variables are bound.
+
+    py query_engine.py -e 'SELECT ?n WHERE { ?n a :Node }'
+    py query_engine.py queries/agents_by_framework.rq --input data/nq_data
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from pipeline import json_parser
+from triple_store import TripleStore
+from turtle_reader import unescape_string
+
+QueryResult = namedtuple("QueryResult", ["variables", "rows"])
+
+XSD_INTEGER = "<http://www.w3.org/2001/XMLSchema#integer>"
+
+
+class QueryError(ValueError):
+    pass
+
+
+# -------------------------
+# Tokenizer
+# -------------------------
+TOKEN = re.compile(r"""
+    (?P<ws>\s+|\#[^\n]*)
+  | (?P<iri><[^<>"{}|^`\\\s]*>)
+  | (?P<var>[?$][A-Za-z_][A-Za-z0-9_]*)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<number>[+-]?\d+(?:\.\d+)?)
+  | (?P<pname>(?:[A-Za-z][\w.-]*)?:[\w.%-]*(?<!\.))
+  | (?P<word>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>&&|\|\||!=|<=|>=|[{}().;,*=<>!])
+""", re.VERBOSE)
+
+def tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = TOKEN.match(text, pos)
+        if not m:
+            raise QueryError(f"unexpected character at {pos}: {text[pos:pos + 20]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind != "ws":
+            tokens.append((kind, m.group()))
+    tokens.append(("eof", ""))
+    return tokens
+
+
+# -------------------------
+# Parser
+# -------------------------
+# Term nodes: ("var", name) | ("iri", "<...>") | ("pname", "p:l") | ("literal", text) | ("number", float)
+# Expression nodes: terms, ("call", NAME, [args]), ("op", OP, [args])
+Pattern = namedtuple("Pattern", ["s", "p", "o", "g"])
+Query = namedtuple("Query", ["prefixes", "distinct", "projection", "patterns", "filters", "binds",
+                             "group_by", "order_by", "limit", "offset"])
+
+AGGREGATES = ("COUNT", "SAMPLE", "MIN", "MAX", "GROUP_CONCAT")
+COMPARISONS = ("=", "!=", "<", ">", "<=", ">=")
+
+
+class Parser:
+    def __init__(self, text):
+        self.tokens = tokenize(text)
+        self.i = 0
+
+    # --- token helpers ---
+    def peek(self, offset=0):
+        return self.tokens[self.i + offset]
+
+    def next(self):
+        tok = self.tokens[self.i]
+        self.i += 1
+        return tok
+
+    def at_word(self, *words):
+        kind, value = self.peek()
+        return kind in ("word", "pname") and value.upper() in words
+
+    def accept(self, value):
+        if self.peek()[1] == value or (self.peek()[0] == "word" and self.peek()[1].upper() == value):
+            self.i += 1
+            return True
+        return False
+
+    def expect(self, value):
+        if not self.accept(value):
+            raise QueryError(f"expected {value!r}, got {self.peek()[1]!r}")
+
+    # --- query ---
+    def parse(self):
+        prefixes = {}
+        while self.at_word("PREFIX"):
+            self.next()
+            kind, pname = self.next()
+            kind_iri, iri = self.next()
+            if kind != "pname" or not pname.endswith(":") or kind_iri != "iri":
+                raise QueryError("PREFIX needs 'name: <iri>'")
+            prefixes[pname[:-1]] = iri[1:-1]
+
+        self.expect("SELECT")
+        distinct = self.accept("DISTINCT")
+        projection = []
+        if self.accept("*"):
+            projection = None
+        else:
+            while self.peek()[0] == "var" or self.peek()[1] == "(":
+                if self.peek()[0] == "var":
+                    projection.append((self.next()[1][1:], None))
+                    continue
+                self.expect("(")
+                expr = self.parse_expression()
+                self.expect("AS")
+                kind, name = self.next()
+                if kind != "var":
+                    raise QueryError("AS needs a variable")
+                self.expect(")")
+                projection.append((name[1:], expr))
+            if not projection:
+                raise QueryError("SELECT needs variables or *")
+
+        self.accept("WHERE")
+        patterns, filters, binds = [], [], []
+        self.parse_group(patterns, filters, binds, None)
+
+        group_by, order_by, limit, offset = [], [], None, 0
+        while self.peek()[0] != "eof":
+            if self.accept("GROUP"):
+                self.expect("BY")
+                while self.peek()[0] == "var":
+                    group_by.append(self.next()[1][1:])
+            elif self.accept("ORDER"):
+                self.expect("BY")
+                while True:
+                    if self.at_word("ASC", "DESC"):
+                        descending = self.next()[1].upper() == "DESC"
+                        self.expect("(")
+                        expr = self.parse_expression()
+                        self.expect(")")
+                    elif self.peek()[0] == "var":
+                        descending, expr = False, ("var", self.next()[1][1:])
+                    else:
+                        break
+                    order_by.append((expr, descending))
+            elif self.accept("LIMIT"):
+                limit = int(self.next()[1])
+            elif self.accept("OFFSET"):
+                offset = int(self.next()[1])
+            else:
+                raise QueryError(f"unexpected {self.peek()[1]!r} after WHERE clause")
+        return Query(prefixes, distinct, projection, patterns, filters, binds, group_by, order_by, limit, offset)
+
+    def parse_group(self, patterns, filters, binds, graph):
+        self.expect("{")
+        while not self.accept("}"):
+            if self.accept("."):
+                continue
+            if self.accept("FILTER"):
+                filters.append(self.parse_constraint())
+            elif self.accept("BIND"):
+                self.expect("(")
+                expr = self.parse_expression()
+                self.expect("AS")
+                kind, name = self.next()
+                if kind != "var":
+                    raise QueryError("AS needs a variable")
+                self.expect(")")
+                binds.append((name[1:], expr))
+            elif self.accept("GRAPH"):
+                self.parse_group(patterns, filters, binds, self.parse_term())
+            elif self.peek()[0] == "eof":
+                raise QueryError("missing '}'")
+            else:
+                self.parse_triples(patterns, graph)
+
+    def parse_triples(self, patterns, graph):
+        subject = self.parse_term()
+        while True:
+            if self.peek() == ("word", "a"):
+                self.next()
+                predicate = ("pname", "rdf:type")
+            else:
+                predicate = self.parse_term()
+            while True:
+                patterns.append(Pattern(subject, predicate, self.parse_term(), graph))
+                if not self.accept(","):
+                    break
+            if not self.accept(";"):
+                break
+            if self.peek()[1] in (".", "}"):
+                break
+
+    def parse_term(self):
+        kind, value = self.next()
+        if kind == "var":
+            return ("var", value[1:])
+        if kind == "iri":
+            return ("iri", value)
+        if kind == "pname":
+            return ("pname", value)
+        if kind == "string":
+            return ("literal", unescape_string(value))
+        if kind == "number":
+            return ("number", float(value))
+        if kind == "word" and value.lower() in ("true", "false"):
+            return ("literal", value.lower())
+        raise QueryError(f"expected a term, got {value!r}")
+
+    def parse_constraint(self):
+        if self.peek()[1] == "(":
+            self.next()
+            expr = self.parse_expression()
+            self.expect(")")
+            return expr
+        return self.parse_primary()
+
+    # --- expressions: || < && < comparison < unary < primary ---
+    def parse_expression(self):
+        left = self.parse_and()
+        while self.accept("||"):
+            left = ("op", "||", [left, self.parse_and()])
+        return left
+
+    def parse_and(self):
+        left = self.parse_comparison()
+        while self.accept("&&"):
+            left = ("op", "&&", [left, self.parse_comparison()])
+        return left
+
+    def parse_comparison(self):
+        left = self.parse_unary()
+        if self.peek()[0] == "op" and self.peek()[1] in COMPARISONS:
+            op = self.next()[1]
+            return ("op", op, [left, self.parse_unary()])
+        return left
+
+    def parse_unary(self):
+        if self.accept("!"):
+            return ("op", "!", [self.parse_unary()])
+        return self.parse_primary()
+
+    def parse_primary(self):
+        kind, value = self.peek()
+        if value == "(":
+            self.next()
+            expr = self.parse_expression()
+            self.expect(")")
+            return expr
+        if kind == "word" and self.peek(1)[1] == "(":
+            name = self.next()[1].upper()
+            self.expect("(")
+            if name in AGGREGATES:
+                return self.parse_aggregate(name)
+            args = []
+            while not self.accept(")"):
+                args.append(self.parse_expression())
+                self.accept(",")
+            return ("call", name, args)
+        return self.parse_term()
+
+    def parse_aggregate(self, name):
+        distinct = self.accept("DISTINCT")
+        arg = None if self.accept("*") else self.parse_expression()
+        separator = " "
+        if self.accept(";"):
+            self.expect("SEPARATOR")
+            self.expect("=")
+            separator = unescape_string(self.next()[1])
+        self.expect(")")
+        return ("aggregate", name, [arg, distinct, separator])
+
+
+def parse_query(text):
+    return Parser(text).parse()
+
+
+# -------------------------
+# Expression evaluation
+# -------------------------
+class Iri(str):
+    # an IRI value inside expressions (STR() turns it into plain text)
+    pass
+
+
+def term_value(term):
+    # N-Triples term -> expression value: Iri, int for xsd:integer, str for other literals and blank nodes
+    if term.startswith("<"):
+        return Iri(term[1:-1])
+    if term.startswith('"'):
+        end = term.rfind('"')
+        if term.endswith(f"^^{XSD_INTEGER}"):
+            return int(term[1:end])
+        try:
+            return json.loads(term[:end + 1])
+        except ValueError:
+            return term[1:end]
+    return term
+
+
+def value_term(value):
+    # expression value -> N-Triples term, for BIND results and aggregates
+    if isinstance(value, Iri):
+        return f"<{value}>"
+    if isinstance(value, bool):
+        return json_parser.nt_literal("true" if value else "false")
+    if isinstance(value, int):
+        return f'"{value}"^^{XSD_INTEGER}'
+    if isinstance(value, float):
+        return json_parser.nt_literal(repr(value))
+    return json_parser.nt_literal(value)
+
+
+def as_number(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    return float(value)
+
+
+def compare(op, a, b):
+    if isinstance(a, (int, float)) or isinstance(b, (int, float)):
+        a, b = as_number(a), as_number(b)
+    elif isinstance(a, Iri) != isinstance(b, Iri) and op in ("=", "!="):
+        return op == "!="
+    return {"=": a == b, "!=": a != b, "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b}[op]
+
+
+def fn_regex(text, pattern, flags=""):
+    re_flags = 0
+    for flag in flags:
+        re_flags |= {"i": re.I, "m": re.M, "s": re.S, "x": re.X}.get(flag, 0)
+    return re.search(pattern, text, re_flags) is not None
+
+
+def fn_before(text, sep):
+    i = text.find(sep)
+    return text[:i] if i >= 0 else ""
+
+
+def fn_after(text, sep):
+    i = text.find(sep)
+    return text[i + len(sep):] if i >= 0 else ""
+
+
+FUNCTIONS = {
+    "CONTAINS": lambda a, b: b in a,
+    "STRSTARTS": lambda a, b: a.startswith(b),
+    "STRENDS": lambda a, b: a.endswith(b),
+    "STRBEFORE": fn_before,
+    "STRAFTER": fn_after,
+    "REGEX": fn_regex,
+    "STR": lambda a: str(a),
+    "LCASE": lambda a: a.lower(),
+    "UCASE": lambda a: a.upper(),
+    "STRLEN": lambda a: len(a),
+    "ISIRI": lambda a: isinstance(a, Iri),
+    "ISURI": lambda a: isinstance(a, Iri),
+    "ISLITERAL": lambda a: isinstance(a, str) and not isinstance(a, Iri),
+}
+
+
+class Unbound(Exception):
+    pass
+
+
+# -------------------------
+# Engine
+# -------------------------
+class QueryEngine:
+    """
+    Runs parsed queries against a TripleStore. Bindings are dicts of
+    variable -> store term id (int), or an N-Triples term string for values
+    computed by BIND / aggregates.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    # --- terms ---
+    def constant_term(self, node, prefixes):
+        # constant query term -> N-Triples form; query PREFIXes win over the store's
+        kind, value = node
+        if kind == "iri":
+            return value
+        if kind == "pname":
+            prefix, _, local = value.partition(":")
+            if prefix in prefixes:
+                return f"<{prefixes[prefix]}{local}>"
+            try:
+                return json_parser.expand_curie(value, self.store.prefixes)
+            except ValueError:
+                raise QueryError(f"undeclared prefix in {value}") from None
+        if kind == "number":
+            return json_parser.nt_literal(format_number(value))
+        return json_parser.nt_literal(value)
+
+    def constant_id(self, node, prefixes):
+        return self.store.terms.lookup(self.constant_term(node, prefixes))
+
+    def decode(self, value):
+        return self.store.terms.decode(value) if isinstance(value, int) else value
+
+    # --- expressions ---
+    def evaluate(self, expr, binding, prefixes):
+        kind = expr[0]
+        if kind == "var":
+            if expr[1] not in binding:
+                raise Unbound(expr[1])
+            return term_value(self.decode(binding[expr[1]]))
+        if kind == "literal":
+            return expr[1]
+        if kind == "number":
+            return expr[1]
+        if kind in ("iri", "pname"):
+            return term_value(self.constant_term(expr, prefixes))
+        if kind == "op":
+            op, args = expr[1], expr[2]
+            if op == "||":
+                return self.truth(args[0], binding, prefixes) or self.truth(args[1], binding, prefixes)
+            if op == "&&":
+                return self.truth(args[0], binding, prefixes) and self.truth(args[1], binding, prefixes)
+            if op == "!":
+                return not self.truth(args[0], binding, prefixes)
+            return compare(op, self.evaluate(args[0], binding, prefixes), self.evaluate(args[1], binding, prefixes))
+        if kind == "call":
+            name, args = expr[1], expr[2]
+            if name == "BOUND":
+                return args[0][1] in binding
+            if name not in FUNCTIONS:
+                raise QueryError(f"unknown function {name}")
+            return FUNCTIONS[name](*(self.evaluate(a, binding, prefixes) for a in args))
+        if kind == "aggregate":
+            raise QueryError("aggregates are only allowed in SELECT")
+        raise QueryError(f"cannot evaluate {expr!r}")
+
+    def truth(self, expr, binding, prefixes):
+        # SPARQL effective boolean value; errors and unbound variables are false
+        try:
+            value = self.evaluate(expr, binding, prefixes)
+        except (Unbound, TypeError, ValueError, re.error):
+            return False
+        if isinstance(value, str) and not isinstance(value, Iri):
+            return value not in ("", "false")
+        return bool(value)
+
+    # --- join ordering ---
+    def compile_patterns(self, query):
+        # -> [(s, p, o, g)] with ("var", name) or ("id", int) per position; None if a constant is unknown
+        compiled = []
+        for pattern in query.patterns:
+            slots = []
+            for node in pattern:
+                if node is None or node[0] == "var":
+                    slots.append(node)
+                    continue
+                tid = self.constant_id(node, query.prefixes)
+                if tid is None:
+                    return None
+                slots.append(("id", tid))
+            compiled.append(tuple(slots))
+        return compiled
+
+    def estimate(self, pattern, bound):
+        """
+        Estimated matches of one pattern per current binding: the exact
+        count for its constants, divided by the number of distinct values
+        for every position a bound variable will fill.
+        """
+        ids = [slot[1] if slot and slot[0] == "id" else None for slot in pattern[:3]]
+        count = self.store.count_ids(*ids)
+        store = self.store
+        distinct = (len(store.spo), len(store.pos), len(store.osp))
+        for position, slot in enumerate(pattern[:3]):
+            if slot and slot[0] == "var" and slot[1] in bound:
+                if position == 2 and ids[1] is not None:
+                    count /= max(1, len(store.pos.get(ids[1], ())))
+                else:
+                    count /= max(1, distinct[position])
+        return count
+
+    def order_patterns(self, patterns):
+        """
+        Greedy order: repeatedly take the cheapest remaining pattern, preferring
+        ones that share a variable with what is already bound.
+        """
+        remaining = list(patterns)
+        bound = set()
+        ordered = []
+        while remaining:
+            def cost(pattern):
+                pattern_vars = {slot[1] for slot in pattern if slot and slot[0] == "var"}
+                connected = not bound or bool(pattern_vars & bound) or not pattern_vars
+                return (not connected, self.estimate(pattern, bound))
+            best = min(remaining, key=cost)
+            remaining.remove(best)
+            ordered.append(best)
+            bound |= {slot[1] for slot in best if slot and slot[0] == "var"}
+        return ordered
+
+    # --- joins ---
+    def match(self, pattern, binding):
+        """
+        Extend one binding with every match of pattern (index lookup with the
+        binding's values substituted).
+        """
+        ids = []
+        for slot in pattern[:3]:
+            if slot[0] == "id":
+                ids.append(slot[1])
+            elif slot[1] in binding:
+                value = binding[slot[1]]
+                if not isinstance(value, int):
+                    value = self.store.terms.lookup(value)
+                    if value is None:
+                        return
+                ids.append(value)
+            else:
+                ids.append(None)
+        graph = pattern[3]
+        for triple in self.store.triples_ids(*ids):
+            extended = dict(binding)
+            ok = True
+            for slot, tid in zip(pattern[:3], triple):
+                if slot[0] == "var":
+                    if extended.setdefault(slot[1], tid) != tid:
+                        ok = False
+                        break
+            if not ok:
+                continue
+            if graph is None:
+                yield extended
+                continue
+            for g in self.store.graphs_ids(triple):
+                if graph[0] == "id":
+                    if g == graph[1]:
+                        yield extended
+                elif extended.get(graph[1], g) == g:
+                    yield dict(extended, **{graph[1]: g})
+
+    def join(self, bindings, pattern):
+        pattern_vars = {slot[1] for slot in pattern if slot and slot[0] == "var"}
+        shared = sorted(pattern_vars & set(bindings[0])) if bindings else []
+        ids = [slot[1] if slot[0] == "id" else None for slot in pattern[:3]]
+        scan_size = self.store.count_ids(*ids)
+
+        if shared and len(bindings) <= scan_size:
+            # index nested loop: one lookup per binding
+            return [extended for binding in bindings for extended in self.match(pattern, binding)]
+
+        # hash join: scan the pattern once, probe with the current bindings
+        table = {}
+        for row in self.match(pattern, {}):
+            table.setdefault(tuple(row[v] for v in shared), []).append(row)
+        joined = []
+        for binding in bindings:
+            key = tuple(binding[v] for v in shared)
+            for row in table.get(key, ()):
+                joined.append({**binding, **row})
+        return joined
+
+    # --- query ---
+    def execute(self, query):
+        if isinstance(query, str):
+            query = parse_query(query)
+        prefixes = query.prefixes
+
+        compiled = self.compile_patterns(query)
+        bindings = [{}]
+        pending = list(query.filters)
+        if compiled is None:
+            bindings = []
+        else:
+            for pattern in self.order_patterns(compiled):
+                bindings = self.join(bindings, pattern)
+                if not bindings:
+                    break
+                bound = set(bindings[0])
+                ready = [f for f in pending if expression_vars(f) <= bound]
+                if ready:
+                    pending = [f for f in pending if f not in ready]
+                    bindings = [b for b in bindings if all(self.truth(f, b, prefixes) for f in ready)]
+
+        for name, expr in query.binds:
+            for binding in bindings:
+                try:
+                    binding[name] = value_term(self.evaluate(expr, binding, prefixes))
+                except (Unbound, TypeError, ValueError, re.error):
+                    pass
+        if pending:
+            bindings = [b for b in bindings if all(self.truth(f, b, prefixes) for f in pending)]
+
+        rows, variables = self.project(query, bindings)
+
+        if query.order_by:
+            for expr, descending in reversed(query.order_by):
+                rows.sort(key=lambda row: self.sort_key(expr, dict(zip(variables, row)), prefixes),
+                          reverse=descending)
+        if query.distinct:
+            rows = list(dict.fromkeys(rows))
+        end = None if query.limit is None else query.offset + query.limit
+        return QueryResult(variables, rows[query.offset:end])
+
+    def project(self, query, bindings):
+        aggregated = query.group_by or any(
+            expr is not None and contains_aggregate(expr) for _, expr in query.projection or ())
+        if query.projection is None:
+            if aggregated:
+                raise QueryError("SELECT * cannot be used with GROUP BY")
+            variables = []
+            for pattern in query.patterns:
+                for node in pattern:
+                    if node and node[0] == "var" and node[1] not in variables:
+                        variables.append(node[1])
+            variables += [name for name, _ in query.binds if name not in variables]
+            projection = [(v, None) for v in variables]
+        else:
+            projection = query.projection
+            variables = [name for name, _ in projection]
+
+        if not aggregated:
+            rows = []
+            for binding in bindings:
+                row = []
+                for name, expr in projection:
+                    if expr is None:
+                        value = binding.get(name)
+                        row.append(self.decode(value) if value is not None else None)
+                    else:
+                        try:
+                            row.append(value_term(self.evaluate(expr, binding, query.prefixes)))
+                        except (Unbound, TypeError, ValueError, re.error):
+                            row.append(None)
+                rows.append(tuple(row))
+            return rows, variables
+
+        groups = {}
+        for binding in bindings:
+            key = tuple(binding.get(v) for v in query.group_by)
+            groups.setdefault(key, []).append(binding)
+        if not groups and not query.group_by:
+            groups[()] = []
+        rows = []
+        for key, members in groups.items():
+            group_binding = dict(zip(query.group_by, key))
+            row = []
+            for name, expr in projection:
+                if expr is None:
+                    if name not in query.group_by:
+                        raise QueryError(f"?{name} is neither grouped nor aggregated")
+                    value = group_binding.get(name)
+                    row.append(self.decode(value) if value is not None else None)
+                else:
+                    row.append(self.aggregate(expr, members, query.prefixes))
+            rows.append(tuple(row))
+        return rows, variables
+
+    def aggregate(self, expr, members, prefixes):
+        if expr[0] != "aggregate":
+            raise QueryError("only aggregates can be computed per group")
+        name, (arg, distinct, separator) = expr[1], expr[2]
+        if arg is None:
+            values = [tuple(sorted(b.items())) for b in members]
+        else:
+            values = []
+            for binding in members:
+                try:
+                    values.append(self.evaluate(arg, binding, prefixes))
+                except (Unbound, TypeError, ValueError, re.error):
+                    pass
+        if distinct:
+            values = list(dict.fromkeys(values))
+        if name == "COUNT":
+            return value_term(len(values))
+        if not values:
+            return None
+        if name == "SAMPLE":
+            return value_term(values[0])
+        if name == "MIN":
+            return value_term(min(values))
+        if name == "MAX":
+            return value_term(max(values))
+        return value_term(separator.join(str(v) for v in values))
+
+    def sort_key(self, expr, row, prefixes):
+        binding = {k: v for k, v in row.items() if v is not None}
+        try:
+            value = self.evaluate(expr, binding, prefixes)
+        except (Unbound, TypeError, ValueError, re.error):
+            return (0, 0, "")
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (1, value, "")
+        return (2, 0, str(value))
+
+
+def format_number(value):
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def expression_vars(expr):
+    kind = expr[0]
+    if kind == "var":
+        return {expr[1]}
+    if kind in ("op", "call"):
+        if kind == "call" and expr[1] == "BOUND":
+            return set()
+        return set().union(*(expression_vars(a) for a in expr[2])) if expr[2] else set()
+    return set()
+
+
+def contains_aggregate(expr):
+    if expr[0] == "aggregate":
+        return True
+    if expr[0] in ("op", "call"):
+        return any(contains_aggregate(a) for a in expr[2])
+    return False
+
+
+def format_term(store, term):
+    # table cell: CURIE for IRIs, bare text for plain literals, lexical form for integers
+    if term is None:
+        return ""
+    if term.startswith("<"):
+        return store.curie(term)
+    if term.endswith(f"^^{XSD_INTEGER}"):
+        return term[1:term.rfind('"')]
+    return term
+
+
+def print_result(store, result, out=sys.stdout):
+    cells = [[format_term(store, t) for t in row] for row in result.rows]
+    header = [f"?{v}" for v in result.variables]
+    widths = [max([len(h)] + [len(r[i]) for r in cells]) for i, h in enumerate(header)]
+    out.write("  ".join(h.ljust(w) for h, w in zip(header, widths)).rstrip() + "\n")
+    for row in cells:
+        out.write("  ".join(c.ljust(w) for c, w in zip(row, widths)).rstrip() + "\n")
+    out.write(f"({len(result.rows)} rows)\n")
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Run a SPARQL-style query over the converted graphs.")
+    parser.add_argument("query_file", nargs="?", help="file holding the query")
+    parser.add_argument("-e", "--query", help="query text (instead of a file)")
+    parser.add_argument("--input", default=os.path.join(script_dir, "data", "json_data"),
+                        help="folder of .json files, .jsonl shards or .nt/.nq chunks (default data/json_data)")
+    parser.add_argument("--db", help="read the graph from a sqlite_store.py database instead of --input")
+    args = parser.parse_args()
+
+    if args.query:
+        text = args.query
+    elif args.query_file:
+        with open(args.query_file, "r", encoding="utf-8") as f:
+            text = f.read()
+    else:
+        parser.error("give a query file or -e QUERY")
+
+    if args.db:
+        from sqlite_store import SqliteStore
+        with SqliteStore(args.db) as db:
+            store = db.load_triple_store()
+    else:
+        store = TripleStore.from_folder(args.input)
+    try:
+        result = QueryEngine(store).execute(text)
+    except QueryError as e:
+        sys.exit(f"[ERROR] {e}")
+    print_result(store, result)
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+raw_extractor.py
+Direct extractor: data/raw_data sources -> prefixes/resources JSON, with no
+hand-written analyzed .txt in between.
+
+Behavior:
+- Python sources (AutoGen, CrewAI, LangGraph) are read with the ast module.
+  Constructor calls of classes imported from a framework package
+  (AssistantAgent(...), Agent(...), Task(...), Crew(...), StateGraph(), ...)
+  or reached through an imported framework module (autogen.AssistantAgent(...)),
+  classes subclassing them (class WriteBookFlow(Flow)) and graph builder
+  calls (graph.add_node(...), add_edge, set_entry_point, ...) become entities.
+- Mastra .json / .yaml definitions are streamed by mastra_loader.
+- The result has the same shape as convert_pattern_to_autogen's intermediate
+  object, so framework detection, the normalizers and the resource mapper of
+  analyzed-parser.py run on it unchanged.
+- Files are extracted across a process pool (--workers), and extraction
+  results are cached on disk keyed by the source file's hash (and the
+  extractor's own code), so unchanged sources are never parsed twice.
+- Writes one JSON per source file into data/extracted_data/<framework>/.
+"""
+
+import argparse
+import ast
+import json
+import os
+from functools import partial
+
+import mastra_loader
+from build_manifest import bytes_digest, converter_digest, file_digest, manifest_key
+from pipeline import analyzed_parser
+from run_report import Timed, graph_size, open_report
+
+EntityRecord = analyzed_parser.EntityRecord
+SourceRef = analyzed_parser.SourceRef
+
+# top-level package -> framework name as written in the analyzed "Framework" field
+FRAMEWORK_PACKAGES = {
+    "autogen": "AutoGen",
+    "crewai": "CrewAI",
+    "langgraph": "LangGraph",
+}
+
+# graph builder methods recorded on the graph entity (add_node creates a Node entity)
+GRAPH_METHODS = {
+    "set_entry_point": "entry_point",
+    "set_finish_point": "finish_point",
+    "add_edge": "edges",
+    "add_conditional_edges": "conditional_edges",
+}
+
+# flow decorators recorded on the Flow entity
+FLOW_DECORATORS = ("start", "listen", "router")
+
+# cached records hold EntityRecords built with analyzed-parser's class mapping, so it counts too
+EXTRACTOR_VERSION = converter_digest([os.path.abspath(__file__), mastra_loader.__file__, analyzed_parser.__file__])
+
+
+# -------------------------
+# Value rendering
+# -------------------------
+def value_text(node):
+    """
+    Render an argument the way the analyzed tables write example values:
+    plain text for literals, "{expr}" holes for f-strings, comma lists for
+    lists, and bare names for references (self.writer() -> writer).
+    """
+    if isinstance(node, ast.Constant):
+        return str(node.value)
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for v in node.values:
+            if isinstance(v, ast.Constant):
+                parts.append(str(v.value))
+            else:
+                parts.append("{" + ast.unparse(v.value) + "}")
+        return "".join(parts)
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return ", ".join(value_text(e) for e in node.elts)
+    if isinstance(node, ast.Call):
+        return value_text(node.func)
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ast.unparse(node)
+
+
+def call_name(node):
+    # AssistantAgent(...) -> "AssistantAgent", autogen.AssistantAgent(...) -> "AssistantAgent"
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def entity_id(name):
+    return name.lower().replace(" ", "_").strip()
+
+
+# -------------------------
+# AST walk
+# -------------------------
+class PatternVisitor(ast.NodeVisitor):
+    """
+    Collects entities from one module, in source order.
+    Only names imported from a framework package count as framework classes,
+    so tools (crewai_tools) and pydantic models are ignored.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.framework = ""
+        self.classes = {}      # local name -> framework class name
+        self.modules = set()   # local names bound to a framework package or submodule
+        self.entities = []
+        self.graphs = {}       # variable name -> graph EntityRecord
+        self._class_stack = []
+        self._func_stack = []
+        self._assign_target = None
+        self._counts = {}
+        # char offset of every line start, for (offset, length) spans
+        self._line_starts = [0]
+        for line in source.splitlines(keepends=True):
+            self._line_starts.append(self._line_starts[-1] + len(line))
+
+    # --- imports ---
+    def visit_ImportFrom(self, node):
+        package = (node.module or "").split(".")[0]
+        framework = FRAMEWORK_PACKAGES.get(package)
+        if framework:
+            self.framework = self.framework or framework
+            for alias in node.names:
+                if alias.name[:1].isupper():
+                    self.classes[alias.asname or alias.name] = alias.name
+                else:
+                    # from autogen import agentchat
+                    self.modules.add(alias.asname or alias.name)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            framework = FRAMEWORK_PACKAGES.get(alias.name.split(".")[0])
+            if framework:
+                self.framework = self.framework or framework
+                # import autogen.agentchat binds "autogen"; import autogen as ag binds "ag"
+                self.modules.add(alias.asname or alias.name.split(".")[0])
+
+    def framework_class(self, node):
+        """
+        Framework class an expression names: AssistantAgent for an imported
+        name, or autogen.AssistantAgent / ag.agentchat.AssistantAgent for an
+        attribute of an imported framework module. None otherwise.
+        """
+        if isinstance(node, ast.Name):
+            return self.classes.get(node.id)
+        if isinstance(node, ast.Attribute) and node.attr[:1].isupper():
+            base = node.value
+            while isinstance(base, ast.Attribute):
+                base = base.value
+            if isinstance(base, ast.Name) and base.id in self.modules:
+                return node.attr
+        return None
+
+    # --- scopes ---
+    def visit_ClassDef(self, node):
+        bases = [self.framework_class(b) for b in node.bases]
+        base = next((b for b in bases if b), None)
+        if base:
+            attrs = {}
+            for item in node.body:
+                if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                for dec in item.decorator_list:
+                    dec_name = call_name(dec) if isinstance(dec, ast.Call) else getattr(dec, "id", None)
+                    if dec_name in FLOW_DECORATORS:
+                        attrs[dec_name] = f"{attrs[dec_name]}, {item.name}" if dec_name in attrs else item.name
+            self.add_entity(node.name, base, attrs, node)
+        self._class_stack.append(node.name)
+        self.generic_visit(node)
+        self._class_stack.pop()
+
+    def visit_FunctionDef(self, node):
+        self._func_stack.append(node.name)
+        self.generic_visit(node)
+        self._func_stack.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Assign(self, node):
+        target = node.targets[0] if len(node.targets) == 1 else None
+        if isinstance(target, ast.Name):
+            self._assign_target = target.id
+        elif isinstance(target, ast.Attribute):
+            self._assign_target = target.attr
+        self.visit(node.value)
+        self._assign_target = None
+
+    # --- calls ---
+    def visit_Call(self, node):
+        target, self._assign_target = self._assign_target, None
+        name = call_name(node)
+        cls = self.framework_class(node.func)
+
+        if cls:
+            attrs = {kw.arg: value_text(kw.value) for kw in node.keywords if kw.arg}
+            entity = self.add_entity(self.name_for(cls, target), cls, attrs, node)
+            if "graph" in cls.lower() and target:
+                self.graphs[target] = entity
+        elif isinstance(node.func, ast.Attribute) and isinstance(node.func.value, ast.Name) \
+                and node.func.value.id in self.graphs:
+            self.graph_call(self.graphs[node.func.value.id], name, node)
+
+        self.generic_visit(node)
+
+    def graph_call(self, graph, method, node):
+        args = [value_text(a) for a in node.args]
+        if method == "add_node" and args:
+            attrs = {"name": args[0]}
+            if len(node.args) > 1:
+                attrs["callable"] = ast.unparse(node.args[1])
+            self.add_entity(args[0], "Node", attrs, node)
+        elif method in GRAPH_METHODS:
+            key = GRAPH_METHODS[method]
+            value = " -> ".join(args) if method.endswith("edges") or method == "add_edge" else ", ".join(args)
+            current = graph.attributes.get(key)
+            graph.attributes[key] = f"{current}; {value}" if current else value
+
+    def name_for(self, cls, target):
+        """
+        Entity name: the assigned variable, else the function returning the
+        call (def researcher(self): return Agent(...)), else ClassName_N.
+        A method named after the class (def crew(self): return Crew(...))
+        takes the enclosing class name instead.
+        """
+        if target:
+            return target
+        if self._func_stack:
+            func = self._func_stack[-1]
+            if func.lower() != cls.lower() and not func.startswith("__"):
+                return func
+            if self._class_stack:
+                return self._class_stack[-1]
+        n = self._counts[cls] = self._counts.get(cls, 0) + 1
+        return f"{cls}_{n}"
+
+    def add_entity(self, name, cls, attrs, node):
+        start = self._line_starts[node.lineno - 1] + self._char_col(node.lineno, node.col_offset)
+        end = self._line_starts[node.end_lineno - 1] + self._char_col(node.end_lineno, node.end_col_offset)
+        entity = EntityRecord(
+            entity_id(name),
+            cls,
+            analyzed_parser.maps_to_for_class(cls),
+            attrs,
+            "",
+            ((start, end - start),),
+        )
+        self.entities.append(entity)
+        return entity
+
+    def _char_col(self, lineno, col):
+        # ast columns are UTF-8 byte offsets
+        line = self.source[self._line_starts[lineno - 1]:self._line_starts[lineno]]
+        return len(line.encode("utf-8")[:col].decode("utf-8", errors="ignore"))
+
+
+def extract_python_pattern(source, path=None):
+    """
+    Parse one framework source file into the intermediate structure
+    convert_pattern_to_autogen builds from an analyzed .txt.
+    """
+    tree = ast.parse(source, filename=path or "<pattern>")
+    visitor = PatternVisitor(source)
+    visitor.visit(tree)
+
+    description = (ast.get_docstring(tree) or "").strip()
+    return {
+        "framework": visitor.framework,
+        "file_name": os.path.basename(path) if path else "",
+        "pattern_type": "",
+        "description": description,
+        "entities": visitor.entities,
+        "ontologyRelationalProperties": [],
+        "newOntologyTerms": {},
+        "_source": SourceRef(path, 0, len(source)),
+    }
+
+
+def extract_python_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return extract_python_pattern(f.read(), path)
+
+
+# suffix -> extractor(path) returning the intermediate structure
+EXTRACTORS = {
+    ".py": extract_python_file,
+    **{suffix: mastra_loader.load_mastra_pattern
+       for suffix in mastra_loader.JSON_SUFFIXES + mastra_loader.YAML_SUFFIXES},
+}
+
+
+# -------------------------
+# Parse cache
+# -------------------------
+def cache_path(cache_dir, suffix, source_digest):
+    digest = bytes_digest(EXTRACTOR_VERSION + suffix + source_digest)
+    return os.path.join(cache_dir, digest[:2], digest + ".json")
+
+
+def load_cached(path, source_path):
+    # identical sources share an entry, so file_name comes from the file asked for
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stored["entities"] = [
+        EntityRecord(**dict(e, raw_spans=tuple(map(tuple, e["raw_spans"] or ())))) for e in stored["entities"]
+    ]
+    stored["_source"] = SourceRef(source_path, 0, stored.pop("_source_length"))
+    stored["file_name"] = os.path.basename(source_path)
+    return stored
+
+
+def store_cached(path, raw):
+    stored = {k: v for k, v in raw.items() if k not in ("entities", "_source", "file_name")}
+    stored["entities"] = [e.to_dict() for e in raw["entities"]]
+    stored["_source_length"] = raw["_source"].length
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def extract_raw(input_path, cache_dir=None):
+    """
+    Returns (intermediate structure, cache_hit) for one raw source file.
+    """
+    suffix = os.path.splitext(input_path)[1].lower()
+    cached_at = cache_path(cache_dir, suffix, file_digest(input_path)) if cache_dir else None
+    if cached_at and os.path.exists(cached_at):
+        raw = load_cached(cached_at, input_path)
+        if raw is not None:
+            return raw, True
+
+    raw = EXTRACTORS[suffix](input_path)
+    if cached_at:
+        store_cached(cached_at, raw)
+    return raw, False
+
+
+# -------------------------
+# File processing
+# -------------------------
+def extract_file(input_path, cache_dir=None):
+    """
+    Extract and convert one raw source file.
+    Returns (json_text, error_message, cache_hit, size); failures yield the
+    same empty fallback package analyzed-parser writes. size is
+    (entities, triples) for run reports.
+    """
+    error = None
+    cache_hit = False
+    try:
+        raw, cache_hit = extract_raw(input_path, cache_dir)
+        structured = analyzed_parser.convert_autogen_to_structured_json(raw)
+        packaged = analyzed_parser.structured_to_prefixes_resources(structured, raw)
+    except Exception as e:
+        error = f"[ERROR] Failed parsing {input_path}: {e}"
+        packaged = {"prefixes": analyzed_parser.DEFAULT_PREFIXES, "resources": {}, "error": str(e)}
+    return json.dumps(packaged, ensure_ascii=False, indent=2), error, cache_hit, graph_size(packaged)
+
+
+def iter_raw_files(input_root, output_root):
+    # (input_path, output_file) for every supported source, sorted by folder then file
+    for root, dirs, files in os.walk(input_root):
+        # same order as analyzed-parser's iter_input_files, on every machine
+        dirs.sort()
+        for file in sorted(files):
+            stem, suffix = os.path.splitext(file)
+            if suffix.lower() in EXTRACTORS:
+                output_dir = os.path.join(output_root, os.path.relpath(root, input_root))
+                os.makedirs(output_dir, exist_ok=True)
+                yield os.path.join(root, file), os.path.join(output_dir, stem + ".json")
+
+
+def process_folder(input_root, output_root, workers=1, cache_dir=None, report=None):
+    jobs = list(iter_raw_files(input_root, output_root))
+    results, pool = analyzed_parser.start_map(Timed(partial(extract_file, cache_dir=cache_dir)),
+                                              [input_path for input_path, _ in jobs], workers)
+    hits = 0
+    try:
+        for (input_path, output_file), ((payload, error, cache_hit, size), wall, cpu) in zip(jobs, results):
+            if error:
+                print(error)
+            hits += cache_hit
+
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write(payload)
+            if report:
+                status = "error" if error else "cached" if cache_hit else "built"
+                report.file(manifest_key(input_path, input_root), status, size, wall, cpu)
+
+            print(f"Extracted: {input_path} -> {output_file}")
+    finally:
+        if pool:
+            pool.shutdown()
+    print(f"Extracted {len(jobs)} files ({hits} from cache)")
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Extract prefixes/resources JSON straight from raw framework sources.")
+    parser.add_argument("--input", default=os.path.join(script_dir, "data", "raw_data"),
+                        help="folder of raw sources (default data/raw_data)")
+    parser.add_argument("--output", default=os.path.join(script_dir, "data", "extracted_data"),
+                        help="folder for the JSON output (default data/extracted_data)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes (0 = one per CPU, default 1 = serial)")
+    parser.add_argument("--cache-dir", default=os.path.join(script_dir, ".extract-cache"),
+                        help="parse cache folder (default .extract-cache)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the parse cache")
+    parser.add_argument("--report", metavar="FILE",
+                        help="append a JSON Lines run report (per-file entities, triples, wall/CPU time) to FILE")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    with open_report(args.report, "raw-extractor") as report:
+        process_folder(args.input, args.output, workers=workers, cache_dir=None if args.no_cache else args.cache_dir,
+                       report=report)
@@ -0,0 +1,135 @@
+"""
+run_report.py
+JSON Lines run reports, written by every stage when given --report FILE.
+
+One record per input file, appended as it is processed:
+    {"run": "2025-11-25T22:27:38", "stage": "analyzed-parser", "file": "autogen/chess_game.txt",
+     "pattern": "autogen/chess_game", "framework": "autogen", "status": "built",
+     "entities": 9, "triples": 45, "wall_ms": 3.112, "cpu_ms": 3.05}
+- file is the stage's own input (.txt, .json, a jsonl shard record, ...);
+  pattern is the same for every stage, so records join on it
+- status: built, unchanged (manifest hit, nothing measured), cached or error
+- shacl_validator.py records add "conforms" and "violations"
+- wall/cpu time is measured around the file's work in the process that did
+  it (pool worker or main), so parallel runs report real per-file cost
+- the last record of a run has "summary": true, with totals and throughput
+
+Records are appended, so one file can collect several stages and many runs.
+"""
+
+import json
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+
+class Timed:
+    """
+    Picklable wrapper for pool workers:
+    Timed(func)(*args) -> (func(*args), wall_seconds, cpu_seconds).
+    """
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = self.func(*args, **kwargs)
+        return result, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def graph_size(packaged):
+    # (entities, triples) of a prefixes/resources package
+    resources = packaged.get("resources") or {}
+    return len(resources), sum(len(properties) for properties in resources.values())
+
+
+def pattern_of(key):
+    # "autogen/chess_game.txt" / ".json" -> "autogen/chess_game";
+    # jsonl shard record "autogen/shard-00000.jsonl#chess_game" -> "autogen/chess_game"
+    path, sep, name = key.partition("#")
+    if sep:
+        return f"{os.path.dirname(path)}/{name}" if "/" in path else name
+    return os.path.splitext(key)[0]
+
+
+def framework_of(key):
+    # "autogen/chess_game.txt" -> "autogen"
+    head, sep, _ = key.partition("/")
+    return head if sep else None
+
+
+class RunReport:
+    """
+    Appends one stage's records to a .jsonl report. Use as a context manager;
+    leaving it writes the summary record.
+    """
+
+    def __init__(self, path, stage):
+        self.path = path
+        self.stage = stage
+        self.run = datetime.now().isoformat(timespec="seconds")
+        self.counts = {}
+        self.totals = {"entities": 0, "triples": 0, "wall_ms": 0.0, "cpu_ms": 0.0}
+        self._start = time.perf_counter()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record):
+        self._file.write(json.dumps({"run": self.run, "stage": self.stage, **record}, ensure_ascii=False) + "\n")
+
+    def file(self, key, status="built", size=None, wall=None, cpu=None, pattern=None, **fields):
+        """
+        Record one input file: key is its path relative to the input root,
+        size an (entities, triples) pair, wall/cpu in seconds. pattern
+        defaults to pattern_of(key); stages whose key already is the pattern
+        key pass it as is.
+        """
+        record = {"file": key, "pattern": pattern or pattern_of(key), "framework": framework_of(key),
+                  "status": status}
+        if size is not None:
+            record["entities"], record["triples"] = size
+            self.totals["entities"] += size[0]
+            self.totals["triples"] += size[1]
+        if wall is not None:
+            record["wall_ms"] = round(wall * 1000, 3)
+            record["cpu_ms"] = round(cpu * 1000, 3)
+            self.totals["wall_ms"] += record["wall_ms"]
+            self.totals["cpu_ms"] += record["cpu_ms"]
+        record.update(fields)
+        self.counts[status] = self.counts.get(status, 0) + 1
+        self.write(record)
+
+    def close(self, **fields):
+        if self._file.closed:
+            return
+        elapsed = time.perf_counter() - self._start
+        self.write({
+            "summary": True,
+            "files": sum(self.counts.values()),
+            **self.counts,
+            "entities": self.totals["entities"],
+            "triples": self.totals["triples"],
+            "file_wall_ms": round(self.totals["wall_ms"], 3),
+            "file_cpu_ms": round(self.totals["cpu_ms"], 3),
+            "elapsed_s": round(elapsed, 3),
+            "triples_per_s": round(self.totals["triples"] / elapsed, 1) if elapsed else None,
+            **fields,
+        })
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_report(path, stage):
+    """
+    with open_report(args.report, "stage") as report: ...
+    report is None when no report was asked for, so stages test "if report:".
+    """
+    return RunReport(path, stage) if path else nullcontext()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+shacl_validator.py
+Validate the converted patterns against a SHACL shapes file, in-project.
+
+Behavior:
+- Supports the SHACL core the shapes use: node shapes with sh:targetClass
+  and sh:property shapes with sh:path plus sh:minCount, sh:maxCount,
+  sh:datatype and sh:class. Other constraints are reported as ignored.
+- Reads the shapes with turtle_reader.
+- Validates each pattern of data/json_data (.json or .jsonl shards) as its
+  own graph, like the per-.ttl runs did: the pattern is loaded into a
+  TripleStore, target nodes come from its type (POS) index and values from
+  the SPO index. Patterns are validated across a process pool.
+- Caches results per pattern in <input>/.validation-manifest, keyed by a
+  hash of the pattern's sorted N-Triples; the cache is dropped when the
+  shapes (or this validator) change. Unchanged patterns are only hashed.
+- Writes validation_report.txt in the existing report format (UTF-16):
+  triples and conformance per file, violations under non-conforming files,
+  and the total. Exits 1 when any pattern does not conform.
+
+    py shacl_validator.py                                  # shapes/agento-shapes.ttl over data/json_data
+    py shacl_validator.py --shapes my-shapes.ttl --workers 4
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from collections import namedtuple
+from datetime import datetime
+from functools import partial
+
+import triple_store
+from build_manifest import BuildManifest, bytes_digest, converter_digest
+from jsonl_shards import iter_pattern_documents
+from pipeline import analyzed_parser, json_parser
+from run_report import Timed, graph_size, open_report
+from triple_store import TripleStore, display_curie
+from turtle_reader import RDF_TYPE, XSD_STRING, TurtleError, read_turtle
+
+SH = "http://www.w3.org/ns/shacl#"
+RDF_LANGSTRING = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#langString>"
+
+SUPPORTED = {f"<{SH}{name}>" for name in ("path", "minCount", "maxCount", "datatype", "class")}
+
+
+# -------------------------
+# Shapes
+# -------------------------
+PropertyShape = namedtuple("PropertyShape", ["path", "min_count", "max_count", "datatype", "cls"])
+NodeShape = namedtuple("NodeShape", ["name", "targets", "properties"])
+
+
+def literal_int(term):
+    # '"1"^^<xsd:integer>' -> 1
+    return int(term[1:term.index('"', 1)])
+
+
+def load_shapes(path):
+    """
+    -> (shapes, prefixes, ignored): the node shapes with a target class,
+    the file's prefixes, and the unsupported property constraints seen.
+    """
+    triples, prefixes = read_turtle(path)
+    by_subject = {}
+    for s, p, o in triples:
+        by_subject.setdefault(s, {}).setdefault(p, []).append(o)
+
+    def one(props, name, convert=None):
+        values = props.get(f"<{SH}{name}>")
+        if not values:
+            return None
+        return convert(values[0]) if convert else values[0]
+
+    shapes, ignored = [], set()
+    for subject, props in by_subject.items():
+        targets = props.get(f"<{SH}targetClass>")
+        if not targets:
+            continue
+        properties = []
+        for node in props.get(f"<{SH}property>", []):
+            constraint = by_subject.get(node, {})
+            path_term = one(constraint, "path")
+            if path_term is None:
+                raise TurtleError(f"{path}: property shape of {subject} has no sh:path")
+            ignored.update(p for p in constraint if p.startswith(f"<{SH}") and p not in SUPPORTED)
+            properties.append(PropertyShape(
+                path_term, one(constraint, "minCount", literal_int), one(constraint, "maxCount", literal_int),
+                one(constraint, "datatype"), one(constraint, "class"),
+            ))
+        shapes.append(NodeShape(subject, tuple(targets), tuple(properties)))
+    return shapes, prefixes, sorted(ignored)
+
+
+# -------------------------
+# Validation
+# -------------------------
+def literal_datatype(term):
+    # datatype IRI term of a literal, None for IRIs and blank nodes
+    if not term.startswith('"'):
+        return None
+    tail = term[term.rindex('"') + 1:]
+    if tail.startswith("^^"):
+        return tail[2:]
+    return RDF_LANGSTRING if tail.startswith("@") else XSD_STRING
+
+
+def validate_pattern(shapes, item):
+    """
+    Validate one (pattern_key, packaged) -> (pattern_key, triples, violations),
+    violations being (focus, path, constraint, expected, found) tuples.
+    """
+    key, packaged = item
+    store = TripleStore()
+    store.add_pattern(key, packaged)
+    lookup, decode = store.terms.lookup, store.terms.decode
+    rdf_type = lookup(RDF_TYPE)
+    violations = []
+    for shape in shapes:
+        targets = set()
+        for cls in shape.targets:
+            cls_id = lookup(cls)
+            if cls_id is not None and rdf_type is not None:
+                targets.update(s for s, _, _ in store.triples_ids(None, rdf_type, cls_id))
+        for focus in sorted(targets):
+            for prop in shape.properties:
+                path_id = lookup(prop.path)
+                values = [o for _, _, o in store.triples_ids(focus, path_id, None)] if path_id is not None else []
+                if prop.min_count is not None and len(values) < prop.min_count:
+                    violations.append((decode(focus), prop.path, "minCount", prop.min_count, len(values)))
+                if prop.max_count is not None and len(values) > prop.max_count:
+                    violations.append((decode(focus), prop.path, "maxCount", prop.max_count, len(values)))
+                for value in values:
+                    term = decode(value)
+                    if prop.datatype is not None and literal_datatype(term) != prop.datatype:
+                        violations.append((decode(focus), prop.path, "datatype", prop.datatype, term))
+                    if prop.cls is not None:
+                        cls_id = lookup(prop.cls)
+                        if cls_id is None or rdf_type is None or store.count_ids(value, rdf_type, cls_id) == 0:
+                            violations.append((decode(focus), prop.path, "class", prop.cls, term))
+    return key, len(store), violations
+
+
+# -------------------------
+# Validation cache
+# -------------------------
+CACHE_NAME = ".validation-manifest"
+
+
+def graph_digest(packaged):
+    # canonical fingerprint of a pattern's graph: its distinct N-Triples lines, sorted
+    h = hashlib.sha256()
+    for line in sorted(set(json_parser.iter_ntriples(packaged))):
+        h.update(line.encode("utf-8"))
+    return h.hexdigest()
+
+
+def shapes_digest(shapes):
+    # the parsed shapes, so comment or layout edits to the file keep the cache
+    return bytes_digest(repr(shapes))
+
+
+class ValidationCache(BuildManifest):
+    """
+    Build manifest whose entries also keep the validation result; the
+    converter digest covers the validator code and the shapes.
+    """
+
+    def __init__(self, input_root, shapes, name=CACHE_NAME):
+        code = [os.path.abspath(__file__), triple_store.__file__]
+        super().__init__(input_root, converter_digest(code, {"shapes": shapes_digest(shapes)}), name)
+        self.hits = 0
+
+    def lookup(self, key, digest):
+        # (triples, violations) when the pattern's graph was validated before
+        if not self.is_fresh(key, digest):
+            return None
+        self.hits += 1
+        entry = self.entries[key]
+        return entry["triples"], [tuple(v) for v in entry["violations"]]
+
+    def store(self, key, digest, triples, violations):
+        self.record(key, digest, {})
+        self.entries[key].update(triples=triples, violations=violations)
+
+
+def validate_folder(input_root, shapes, workers=1, cache=None, report=None):
+    """
+    [(pattern_key, triples, violations)] in pattern order. With a cache,
+    only patterns whose graph digest changed are sent to the pool.
+    """
+    results, stale, digests, sizes, timings = [], [], {}, [], {}
+    for key, packaged in iter_pattern_documents(input_root):
+        sizes.append(graph_size(packaged)[0])
+        cached = None
+        if cache is not None:
+            digests[key] = graph_digest(packaged)
+            cached = cache.lookup(key, digests[key])
+        results.append((key, *cached) if cached else None)
+        if not cached:
+            stale.append((len(results) - 1, (key, packaged)))
+
+    validated, pool = analyzed_parser.start_map(Timed(partial(validate_pattern, shapes)),
+                                                [item for _, item in stale], workers)
+    try:
+        for (i, _), (result, wall, cpu) in zip(stale, validated):
+            results[i] = result
+            timings[i] = (wall, cpu)
+            if cache is not None:
+                cache.store(result[0], digests[result[0]], result[1], result[2])
+    finally:
+        if pool:
+            pool.shutdown()
+    if cache is not None:
+        cache.save()
+    if report:
+        for i, (key, triples, violations) in enumerate(results):
+            wall, cpu = timings.get(i, (None, None))
+            report.file(key, "built" if i in timings else "cached", (sizes[i], triples), wall, cpu, pattern=key,
+                        conforms=not violations, violations=[list(v) for v in violations])
+    return results
+
+
+# -------------------------
+# Report
+# -------------------------
+def violation_text(violation, prefixes):
+    focus, path, constraint, expected, found = violation
+    if constraint in ("datatype", "class"):
+        expected, found = display_curie(expected, prefixes), display_curie(found, prefixes)
+    return (f"{display_curie(focus, prefixes)} {display_curie(path, prefixes)}: "
+            f"sh:{constraint} {expected}, found {found}")
+
+
+SECTION = "=" * 44
+RULE = "-" * 44
+
+
+def format_report(results, input_root, shapes_path, prefixes):
+    lines = [
+        "Knowledge Graph Validation Report",
+        f"Generated on: {datetime.now().strftime('%m/%d/%Y %H:%M:%S')}",
+        f"Root Folder: {os.path.abspath(input_root)}",
+        f"SHACL Shape: {os.path.abspath(shapes_path)}",
+        "",
+        SECTION,
+        "",
+    ]
+    total = 0
+    for key, triples, violations in results:
+        total += triples
+        lines += [
+            f"FILE: {key.replace('/', os.sep)}.ttl",
+            f"Triples: {triples}",
+            f"Conforms: {not violations}",
+        ]
+        for violation in violations:
+            lines.append(f"  Violation: {violation_text(violation, prefixes)}")
+        lines += ["", RULE, ""]
+    lines += ["", f"TOTAL TRIPLES ACROSS ALL FILES: {total}", "", "Validation Completed."]
+    return "\n".join(lines) + "\n"
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Validate the converted patterns against SHACL shapes.")
+    parser.add_argument("--input", default=os.path.join(script_dir, "data", "json_data"),
+                        help="folder of per-pattern .json files or .jsonl shards (default data/json_data)")
+    parser.add_argument("--shapes", default=os.path.join(script_dir, "shapes", "agento-shapes.ttl"),
+                        help="SHACL shapes file (default shapes/agento-shapes.ttl)")
+    parser.add_argument("--report", default=os.path.join(script_dir, "validation_report.txt"),
+                        help="report file, written as UTF-16 (default validation_report.txt)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help=f"re-validate every pattern (ignore {CACHE_NAME})")
+    parser.add_argument("--report-jsonl", metavar="FILE",
+                        help="append a JSON Lines run report (per-pattern conformance, violations, wall/CPU time)")
+    args = parser.parse_args()
+
+    try:
+        shapes, shape_prefixes, ignored = load_shapes(args.shapes)
+    except (OSError, TurtleError) as e:
+        sys.exit(f"[ERROR] {e}")
+    for term in ignored:
+        print(f"[WARN] unsupported constraint ignored: {term}")
+
+    cache = None if args.no_cache else ValidationCache(args.input, shapes)
+    with open_report(args.report_jsonl, "shacl-validator") as run_report:
+        results = validate_folder(args.input, shapes, workers=args.workers, cache=cache, report=run_report)
+    prefixes = {**analyzed_parser.DEFAULT_PREFIXES, **shape_prefixes}
+    with open(args.report, "w", encoding="utf-16") as f:
+        f.write(format_report(results, args.input, args.shapes, prefixes))
+
+    failed = [key for key, _, violations in results if violations]
+    for key in failed:
+        print(f"[INVALID] {key}")
+    print(f"Validated {len(results)} patterns against {len(shapes)} shapes: "
+          f"{len(results) - len(failed)} conform, {len(failed)} do not"
+          + (f" ({cache.hits} cached)" if cache else "") + f". Report: {args.report}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+sqlite_store.py
+Persistent graph store: the converted patterns bulk-loaded into SQLite.
+
+Behavior:
+- Terms (in N-Triples form, like triple_store) are dictionary-encoded in a
+  terms table; triples are quads (s, p, o, g) of term ids, where g is the
+  pattern's named graph, in a WITHOUT ROWID table keyed SPOG plus covering
+  POSG / OSPG indexes, so every lookup shape is answered from one index.
+- Loading streams the pattern documents (data/json_data, .json or .jsonl)
+  and writes them with executemany inside large transactions.
+- Incremental: each pattern's content digest is stored; on the next load
+  unchanged patterns are skipped, changed ones have their quads replaced
+  and patterns that disappeared are deleted.
+- Lookups go through a fixed set of SQL statements, one per bound-position
+  shape, which sqlite3 keeps prepared in its statement cache.
+- load_triple_store() rebuilds an in-memory TripleStore from the database
+  without re-parsing any pattern file (query_engine.py --db).
+
+    py sqlite_store.py                                   # load data/json_data -> data/graph.sqlite
+    py sqlite_store.py --match "?" rdf:type :Agent
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+
+from build_manifest import bytes_digest
+from jsonl_shards import iter_pattern_documents
+from pipeline import json_parser
+from triple_store import WILDCARDS, TripleStore, display_curie, lookup_term
+
+SCHEMA_VERSION = 1
+BATCH_PATTERNS = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS prefixes (prefix TEXT PRIMARY KEY, uri TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS patterns (g INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, digest TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS quads (
+    s INTEGER NOT NULL, p INTEGER NOT NULL, o INTEGER NOT NULL, g INTEGER NOT NULL,
+    PRIMARY KEY (s, p, o, g)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quads_posg ON quads (p, o, s, g);
+CREATE INDEX IF NOT EXISTS quads_ospg ON quads (o, s, p, g);
+CREATE INDEX IF NOT EXISTS quads_g ON quads (g);
+"""
+
+# bound positions (s, p, o) -> WHERE clause; the planner picks the covering index
+SHAPE_WHERE = {
+    (False, False, False): "",
+    (True, False, False): "WHERE s = :s",
+    (False, True, False): "WHERE p = :p",
+    (False, False, True): "WHERE o = :o",
+    (True, True, False): "WHERE s = :s AND p = :p",
+    (False, True, True): "WHERE p = :p AND o = :o",
+    (True, False, True): "WHERE o = :o AND s = :s",
+    (True, True, True): "WHERE s = :s AND p = :p AND o = :o",
+}
+MATCH_SQL = {
+    shape: f"SELECT DISTINCT s, p, o FROM quads {where}" for shape, where in SHAPE_WHERE.items()
+}
+COUNT_SQL = {
+    shape: f"SELECT COUNT(*) FROM (SELECT DISTINCT s, p, o FROM quads {where})" for shape, where in SHAPE_WHERE.items()
+}
+GRAPHS_SQL = {
+    shape: f"SELECT DISTINCT patterns.key FROM quads JOIN patterns USING (g) {where} ORDER BY patterns.key"
+    for shape, where in SHAPE_WHERE.items()
+}
+TERM_ID_SQL = "SELECT id FROM terms WHERE term = ?"
+TERM_SQL = "SELECT term FROM terms WHERE id = ?"
+
+
+def pattern_digest(packaged):
+    return bytes_digest(json.dumps(packaged, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
+
+
+class SqliteStore:
+    """
+    SQLite-backed quad store. Open with SqliteStore(path); use as a context
+    manager or call close().
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, cached_statements=256)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.executescript(SCHEMA)
+        version = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if version is None:
+            with self.conn:
+                self.conn.execute("INSERT INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        elif int(version[0]) != SCHEMA_VERSION:
+            raise ValueError(f"{path}: schema version {version[0]}, expected {SCHEMA_VERSION}; delete it and reload")
+        self.prefixes = dict(self.conn.execute("SELECT prefix, uri FROM prefixes"))
+        self._term_ids = None
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- loading ---
+    def _load_term_ids(self):
+        # whole dictionary in memory while bulk loading; ids stay dense (terms are never deleted)
+        if self._term_ids is None:
+            self._term_ids = {term: tid for tid, term in self.conn.execute("SELECT id, term FROM terms")}
+        return self._term_ids
+
+    def _encoder(self, new_terms):
+        ids = self._load_term_ids()
+
+        def encode(term):
+            tid = ids.get(term)
+            if tid is None:
+                tid = ids[term] = len(ids)
+                new_terms.append((tid, term))
+            return tid
+        return encode
+
+    def load(self, patterns, quiet=False):
+        """
+        Upsert (pattern_key, packaged) documents. Patterns whose digest is
+        unchanged are skipped; patterns missing from the input are deleted.
+        Returns counters for the summary line.
+        """
+        conn = self.conn
+        stored = {key: (g, digest) for g, key, digest in conn.execute("SELECT g, key, digest FROM patterns")}
+        seen = set()
+        stats = {"loaded": 0, "unchanged": 0, "removed": 0, "quads": 0}
+        new_terms = []
+        encode = self._encoder(new_terms)
+        pending = 0
+
+        conn.execute("BEGIN")
+        try:
+            for key, packaged in patterns:
+                seen.add(key)
+                digest = pattern_digest(packaged)
+                old = stored.get(key)
+                if old and old[1] == digest:
+                    stats["unchanged"] += 1
+                    continue
+
+                prefixes = packaged.get("prefixes") or {}
+                for prefix, uri in prefixes.items():
+                    if prefix not in self.prefixes:
+                        self.prefixes[prefix] = uri
+                        conn.execute("INSERT INTO prefixes VALUES (?, ?)", (prefix, uri))
+
+                g = encode(json_parser.pattern_graph_iri(key))
+                quads = []
+                for subject, properties in (packaged.get("resources") or {}).items():
+                    s = encode(json_parser.expand_curie(subject, prefixes))
+                    for pred, obj in properties.items():
+                        quads.append((s, encode(json_parser.expand_curie(pred, prefixes)),
+                                      encode(json_parser.nt_object(obj, prefixes)), g))
+
+                if new_terms:
+                    conn.executemany("INSERT INTO terms (id, term) VALUES (?, ?)", new_terms)
+                    new_terms.clear()
+                if old:
+                    conn.execute("DELETE FROM quads WHERE g = ?", (g,))
+                conn.executemany("INSERT OR IGNORE INTO quads (s, p, o, g) VALUES (?, ?, ?, ?)", quads)
+                conn.execute("INSERT OR REPLACE INTO patterns (g, key, digest) VALUES (?, ?, ?)", (g, key, digest))
+                stats["loaded"] += 1
+                stats["quads"] += len(quads)
+                if not quiet:
+                    print(f"{'Updated' if old else 'Loaded'}: {key} ({len(quads)} triples)")
+
+                pending += 1
+                if pending >= BATCH_PATTERNS:
+                    conn.execute("COMMIT")
+                    conn.execute("BEGIN")
+                    pending = 0
+
+            for key, (g, _) in stored.items():
+                if key not in seen:
+                    conn.execute("DELETE FROM quads WHERE g = ?", (g,))
+                    conn.execute("DELETE FROM patterns WHERE g = ?", (g,))
+                    stats["removed"] += 1
+                    if not quiet:
+                        print(f"Removed: {key}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            # ids and prefixes added in the rolled back transaction are gone again
+            self._term_ids = None
+            self.prefixes = dict(conn.execute("SELECT prefix, uri FROM prefixes"))
+            raise
+        return stats
+
+    def load_folder(self, input_root, quiet=False):
+        return self.load(iter_pattern_documents(input_root), quiet=quiet)
+
+    # --- lookups ---
+    def term(self, value):
+        return lookup_term(value, self.prefixes)
+
+    def term_id(self, value):
+        row = self.conn.execute(TERM_ID_SQL, (self.term(value),)).fetchone()
+        return row[0] if row else None
+
+    def decode(self, tid):
+        return self.conn.execute(TERM_SQL, (tid,)).fetchone()[0]
+
+    def _bind(self, pattern):
+        # -> (shape, params) or None when a bound term is unknown
+        shape, params = [], {}
+        for name, value in zip("spo", pattern):
+            if value in WILDCARDS:
+                shape.append(False)
+                continue
+            tid = self.term_id(value)
+            if tid is None:
+                return None
+            shape.append(True)
+            params[name] = tid
+        return tuple(shape), params
+
+    def triples_ids(self, pattern):
+        bound = self._bind(pattern)
+        if bound is None:
+            return iter(())
+        shape, params = bound
+        return self.conn.execute(MATCH_SQL[shape], params)
+
+    def triples(self, pattern):
+        """
+        Yield (s, p, o) terms matching pattern; same lookup values and
+        wildcards as TripleStore.triples.
+        """
+        cache = {}
+        for ids in self.triples_ids(pattern):
+            terms = []
+            for tid in ids:
+                term = cache.get(tid)
+                if term is None:
+                    term = cache[tid] = self.decode(tid)
+                terms.append(term)
+            yield tuple(terms)
+
+    def count(self, pattern):
+        bound = self._bind(pattern)
+        if bound is None:
+            return 0
+        shape, params = bound
+        return self.conn.execute(COUNT_SQL[shape], params).fetchone()[0]
+
+    def patterns_of(self, pattern):
+        bound = self._bind(pattern)
+        if bound is None:
+            return []
+        shape, params = bound
+        return [key for key, in self.conn.execute(GRAPHS_SQL[shape], params)]
+
+    def curie(self, term):
+        return display_curie(term, self.prefixes)
+
+    def __len__(self):
+        return self.conn.execute(COUNT_SQL[(False, False, False)]).fetchone()[0]
+
+    # --- in-memory copy ---
+    def load_triple_store(self):
+        """
+        TripleStore with the same term ids, filled straight from the tables.
+        """
+        store = TripleStore()
+        store.prefixes.update(self.prefixes)
+        for tid, term in self.conn.execute("SELECT id, term FROM terms ORDER BY id"):
+            store.terms.ids[term] = tid
+            store.terms.terms.append(term)
+        add = store.add_ids
+        for s, p, o, g in self.conn.execute("SELECT s, p, o, g FROM quads"):
+            add(s, p, o, g)
+        return store
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Bulk-load the converted graphs into SQLite and look up triples.")
+    parser.add_argument("--db", default=os.path.join(script_dir, "data", "graph.sqlite"),
+                        help="database file (default data/graph.sqlite)")
+    parser.add_argument("--input", default=os.path.join(script_dir, "data", "json_data"),
+                        help="folder of per-pattern .json files or .jsonl shards (default data/json_data)")
+    parser.add_argument("--match", nargs=3, metavar=("S", "P", "O"),
+                        help='look up triples instead of loading ("?" for any position)')
+    parser.add_argument("--quiet", action="store_true", help="only print the summary line")
+    args = parser.parse_args()
+
+    with SqliteStore(args.db) as db:
+        if args.match:
+            for s, p, o in db.triples(args.match):
+                print(db.curie(s), db.curie(p), db.curie(o))
+            print(f"{db.count(args.match)} of {len(db)} triples match", file=sys.stderr)
+        else:
+            stats = db.load_folder(args.input, quiet=args.quiet)
+            print(f"Loaded {stats['loaded']} patterns ({stats['quads']} quads) into {args.db}: "
+                  f"{stats['unchanged']} unchanged, {stats['removed']} removed, {len(db)} triples total")
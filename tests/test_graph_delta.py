@@ -0,0 +1,40 @@
+import json
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import graph_delta
+
+PREFIXES = {"": "http://www.w3id.org/agentic-ai/onto#", "ex": "http://www.w3id.org/agentic-ai/instances#",
+            "dcterms": "http://purl.org/dc/terms/", "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#"}
+
+
+def write_build(root, title):
+    os.makedirs(os.path.join(root, "autogen"))
+    resources = {
+        "ex:assistant": {"rdf:type": ":Agent", "dcterms:title": "line\u2028separated\x85title"},
+        "ex:task": {"rdf:type": ":Task", "dcterms:title": title},
+    }
+    with open(os.path.join(root, "autogen", "chess_game.json"), "w", encoding="utf-8") as f:
+        json.dump({"prefixes": PREFIXES, "resources": resources}, f, ensure_ascii=False)
+
+
+def read_patch(path):
+    with open(path, "r", encoding="utf-8", newline="\n") as f:
+        return f.read().split("\n")[:-1]
+
+
+def test_line_separators_in_literals_stay_inside_their_triple(tmp_path):
+    # U+2028 / \x85 are written raw; only the changed title may show up in the patch
+    write_build(tmp_path / "old", "Old task")
+    write_build(tmp_path / "new", "New task")
+    for scope in ("patterns", "global"):
+        statuses, counts, paths = graph_delta.compute_delta(
+            str(tmp_path / "old"), str(tmp_path / "new"), str(tmp_path / scope), scope=scope)
+        assert statuses == {"autogen/chess_game": "changed"}
+        assert counts == {"removed": 1, "added": 1}
+        removed, added = (read_patch(path) for path in sorted(paths, reverse=True))
+        assert len(removed) == 1 and '"Old task"' in removed[0]
+        assert len(added) == 1 and '"New task"' in added[0]
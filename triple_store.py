@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+triple_store.py
+In-process, indexed triple store over the converted prefixes/resources graphs.
+
+Behavior:
+- Loads packages straight from structured_to_prefixes_resources output, from
+  data/json_data (.json files or .jsonl shards), one pattern at a time, from
+  json-parser.py's N-Triples / N-Quads chunks (data/nt_data, data/nq_data),
+  or from Turtle (data/ttl_data, unified.ttl) through turtle_reader.
+- Terms are kept in N-Triples form (<iri>, "literal", _:b), so CURIEs from
+  different patterns compare by their full IRI, and are dictionary-encoded
+  as integers; the triples live in SPO, POS and OSP hash indexes of ints.
+- Every triple remembers the pattern(s) it came from (named graph
+  <http://www.w3id.org/agentic-ai/patterns/<framework>/<file_name>>).
+- triples((s, p, o)) matches a pattern with None wildcards through the index
+  that has the bound terms first, so a lookup is a few dict hits.
+  count() gives exact cardinalities for join ordering.
+
+    store = TripleStore.from_folder("data/json_data")
+    for s, p, o in store.triples((None, "rdf:type", ":Node")): ...
+    store.patterns_of((None, ":agentRole", "Assistant Agent"))
+
+Run from the repository root for a quick lookup:
+    py triple_store.py "?" rdf:type :Node
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from urllib.parse import unquote
+
+from jsonl_shards import iter_pattern_documents
+from pipeline import analyzed_parser, json_parser
+from turtle_reader import TurtleReader
+
+WILDCARDS = (None, "?", "*")
+
+# one N-Triples / N-Quads line: subject predicate object [graph] .
+NQUAD = re.compile(
+    r'(<[^>]*>|_:\S+)\s+(<[^>]*>)\s+'
+    r'(<[^>]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[A-Za-z0-9-]+|\^\^<[^>]*>)?)'
+    r'(?:\s+(<[^>]*>|_:\S+))?\s*\.\s*$'
+)
+
+
+def canonical_literal(term):
+    # re-escape a plain literal the way json-parser writes it, so lookups match
+    if term.endswith('"'):
+        try:
+            return json_parser.nt_literal(json.loads(term))
+        except ValueError:
+            pass
+    return term
+
+
+def iter_nquads(path):
+    """
+    Yield (s, p, o, g or None) terms for every line of an N-Triples or
+    N-Quads file. Raises ValueError on a line it cannot read.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            m = NQUAD.match(line)
+            if not m:
+                raise ValueError(f"{path}:{n}: not an N-Triples/N-Quads line")
+            s, p, o, g = m.groups()
+            if o.startswith('"'):
+                o = canonical_literal(o)
+            yield s, p, o, g
+
+
+def lookup_term(value, prefixes):
+    """
+    Turn a lookup value into its N-Triples form: terms already in that form
+    pass through, CURIEs with a declared prefix are expanded, anything else is a
+    literal (the same decision the Turtle writer makes).
+    """
+    if value.startswith("<") and value.endswith(">") or value.startswith('"') or value.startswith("_:"):
+        return value
+    if value == "a":
+        value = "rdf:type"
+    return json_parser.nt_object(value, prefixes)
+
+
+def display_curie(term, prefixes):
+    # <full IRI> -> shortest matching prefix:local, for display
+    if not term.startswith("<"):
+        return term
+    iri = term[1:-1]
+    best = None
+    for prefix, uri in prefixes.items():
+        if uri and iri.startswith(uri) and (best is None or len(uri) > len(best[1])):
+            best = (prefix, uri)
+    return f"{best[0]}:{iri[len(best[1]):]}" if best else term
+
+
+class TermDictionary:
+    # term string <-> integer id
+    __slots__ = ("ids", "terms")
+
+    def __init__(self):
+        self.ids = {}
+        self.terms = []
+
+    def encode(self, term):
+        tid = self.ids.get(term)
+        if tid is None:
+            tid = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return tid
+
+    def lookup(self, term):
+        return self.ids.get(term)
+
+    def decode(self, tid):
+        return self.terms[tid]
+
+    def __len__(self):
+        return len(self.terms)
+
+
+def index_add(index, a, b, c):
+    # index[a][b] is the set of c; returns False when already present
+    by_b = index.get(a)
+    if by_b is None:
+        by_b = index[a] = {}
+    cs = by_b.get(b)
+    if cs is None:
+        cs = by_b[b] = set()
+    elif c in cs:
+        return False
+    cs.add(c)
+    return True
+
+
+def index_remove(index, a, b, c):
+    by_b = index[a]
+    cs = by_b[b]
+    cs.discard(c)
+    if not cs:
+        del by_b[b]
+        if not by_b:
+            del index[a]
+
+
+class TripleStore:
+    """
+    Integer-encoded triples with SPO / POS / OSP indexes and per-pattern
+    provenance. Public methods take and return terms as strings; the *_ids
+    variants work on the integer ids (for the query engine).
+    """
+
+    def __init__(self):
+        self.terms = TermDictionary()
+        self.prefixes = {}
+        self.spo = {}
+        self.pos = {}
+        self.osp = {}
+        # per-term triple counts, for count() on one bound position
+        self.s_count = {}
+        self.p_count = {}
+        self.o_count = {}
+        # provenance: graph id -> set of triples, triple -> graph id (or set of ids)
+        self.graph_triples = {}
+        self.triple_graphs = {}
+        self.size = 0
+
+    # --- terms ---
+    def term(self, value):
+        return lookup_term(value, self.prefixes)
+
+    def term_id(self, value):
+        # integer id of a lookup value, None if the store has never seen it
+        return self.terms.lookup(self.term(value))
+
+    def curie(self, term):
+        return display_curie(term, self.prefixes)
+
+    # --- loading ---
+    def add_ids(self, s, p, o, g=None):
+        added = index_add(self.spo, s, p, o)
+        if added:
+            index_add(self.pos, p, o, s)
+            index_add(self.osp, o, s, p)
+            self.s_count[s] = self.s_count.get(s, 0) + 1
+            self.p_count[p] = self.p_count.get(p, 0) + 1
+            self.o_count[o] = self.o_count.get(o, 0) + 1
+            self.size += 1
+        if g is not None:
+            triple = (s, p, o)
+            triples = self.graph_triples.get(g)
+            if triples is None:
+                triples = self.graph_triples[g] = set()
+            triples.add(triple)
+            owner = self.triple_graphs.get(triple)
+            if owner is None:
+                self.triple_graphs[triple] = g
+            elif isinstance(owner, set):
+                owner.add(g)
+            elif owner != g:
+                self.triple_graphs[triple] = {owner, g}
+        return added
+
+    def add_pattern(self, key, packaged):
+        """
+        Load one prefixes/resources package as the named graph of pattern key
+        ("framework/file_name"). Returns the number of new triples.
+        """
+        prefixes = packaged.get("prefixes") or {}
+        for prefix, uri in prefixes.items():
+            self.prefixes.setdefault(prefix, uri)
+        encode = self.terms.encode
+        g = encode(json_parser.pattern_graph_iri(key))
+        added = 0
+        for subject, properties in (packaged.get("resources") or {}).items():
+            s = encode(json_parser.expand_curie(subject, prefixes))
+            for pred, obj in properties.items():
+                p = encode(json_parser.expand_curie(pred, prefixes))
+                o = encode(json_parser.nt_object(obj, prefixes))
+                added += self.add_ids(s, p, o, g)
+        return added
+
+    def remove_pattern(self, key):
+        # drop a pattern's graph; triples other patterns also assert are kept
+        g = self.terms.lookup(json_parser.pattern_graph_iri(key))
+        for triple in self.graph_triples.pop(g, ()):
+            owner = self.triple_graphs[triple]
+            if isinstance(owner, set):
+                owner.discard(g)
+                if len(owner) > 1:
+                    continue
+                self.triple_graphs[triple] = owner.pop()
+                continue
+            del self.triple_graphs[triple]
+            s, p, o = triple
+            index_remove(self.spo, s, p, o)
+            index_remove(self.pos, p, o, s)
+            index_remove(self.osp, o, s, p)
+            for counts, term in ((self.s_count, s), (self.p_count, p), (self.o_count, o)):
+                counts[term] -= 1
+                if not counts[term]:
+                    del counts[term]
+            self.size -= 1
+
+    def load(self, patterns):
+        # patterns: iterable of (pattern_key, packaged), e.g. iter_pattern_documents
+        for key, packaged in patterns:
+            self.add_pattern(key, packaged)
+        return self
+
+    def load_nquads(self, paths):
+        """
+        Load N-Triples / N-Quads files (json-parser.py --format nt|nq). The
+        graph term of a quad becomes the triple's provenance. Line formats
+        carry no prefixes, so the converter's defaults are used for lookups.
+        """
+        for prefix, uri in analyzed_parser.DEFAULT_PREFIXES.items():
+            self.prefixes.setdefault(prefix, uri)
+        encode = self.terms.encode
+        for path in paths:
+            for s, p, o, g in iter_nquads(path):
+                self.add_ids(encode(s), encode(p), encode(o), encode(g) if g else None)
+        return self
+
+    def load_turtle(self, path, key=None):
+        """
+        Stream one Turtle file in; with a pattern key ("framework/file_name")
+        its triples get that pattern's graph as provenance.
+        """
+        encode = self.terms.encode
+        g = encode(json_parser.pattern_graph_iri(key)) if key else None
+        with open(path, "r", encoding="utf-8") as f:
+            reader = TurtleReader(f)
+            for s, p, o in reader:
+                self.add_ids(encode(s), encode(p), encode(o), g)
+        for prefix, uri in reader.prefixes.items():
+            self.prefixes.setdefault(prefix, uri)
+        return self
+
+    @classmethod
+    def from_folder(cls, input_root):
+        """
+        Load everything under input_root: .json / .jsonl pattern documents,
+        .nt / .nq chunk files and .ttl files (per-pattern files get their
+        pattern's graph). input_root may also be a single .ttl/.nt/.nq file.
+        """
+        store = cls()
+        if os.path.isfile(input_root):
+            if input_root.endswith(".ttl"):
+                return store.load_turtle(input_root)
+            return store.load_nquads([input_root])
+        line_files, ttl_files = [], []
+        for root, dirs, files in os.walk(input_root):
+            dirs.sort()
+            line_files.extend(os.path.join(root, f) for f in sorted(files) if f.endswith((".nt", ".nq")))
+            ttl_files.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".ttl"))
+        store.load_nquads(line_files)
+        for path in ttl_files:
+            key = os.path.splitext(os.path.relpath(path, input_root))[0].replace(os.sep, "/")
+            # a merged graph (unified.ttl at the top) belongs to no single pattern
+            store.load_turtle(path, key if "/" in key else None)
+        return store.load(iter_pattern_documents(input_root))
+
+    # --- lookups on ids ---
+    def resolve_ids(self, pattern):
+        """
+        (s, p, o) lookup values -> ids, None for wildcards.
+        Returns None when a bound term is unknown (nothing can match).
+        """
+        ids = []
+        for value in pattern:
+            if value in WILDCARDS:
+                ids.append(None)
+                continue
+            tid = self.term_id(value)
+            if tid is None:
+                return None
+            ids.append(tid)
+        return tuple(ids)
+
+    def triples_ids(self, s=None, p=None, o=None):
+        # every (s, p, o) id triple matching the bound ids, through the best index
+        if s is not None:
+            by_p = self.spo.get(s)
+            if not by_p:
+                return
+            if p is not None:
+                os_ = by_p.get(p)
+                if os_:
+                    if o is None:
+                        for o2 in os_:
+                            yield s, p, o2
+                    elif o in os_:
+                        yield s, p, o
+            elif o is not None:
+                for p2 in self.osp.get(o, {}).get(s, ()):
+                    yield s, p2, o
+            else:
+                for p2, os_ in by_p.items():
+                    for o2 in os_:
+                        yield s, p2, o2
+        elif p is not None:
+            by_o = self.pos.get(p)
+            if not by_o:
+                return
+            if o is not None:
+                for s2 in by_o.get(o, ()):
+                    yield s2, p, o
+            else:
+                for o2, ss in by_o.items():
+                    for s2 in ss:
+                        yield s2, p, o2
+        elif o is not None:
+            for s2, ps in self.osp.get(o, {}).items():
+                for p2 in ps:
+                    yield s2, p2, o
+        else:
+            for s2, by_p in self.spo.items():
+                for p2, os_ in by_p.items():
+                    for o2 in os_:
+                        yield s2, p2, o2
+
+    def count_ids(self, s=None, p=None, o=None):
+        # exact number of matches, from index sizes (no iteration over matches
+        # unless only s and o are bound, which touches one small dict)
+        if s is not None and p is not None:
+            os_ = self.spo.get(s, {}).get(p, ())
+            return (o in os_) if o is not None else len(os_)
+        if p is not None and o is not None:
+            return len(self.pos.get(p, {}).get(o, ()))
+        if s is not None and o is not None:
+            return len(self.osp.get(o, {}).get(s, ()))
+        if s is not None:
+            return self.s_count.get(s, 0)
+        if p is not None:
+            return self.p_count.get(p, 0)
+        if o is not None:
+            return self.o_count.get(o, 0)
+        return self.size
+
+    def graphs_ids(self, triple):
+        owner = self.triple_graphs.get(triple)
+        if owner is None:
+            return ()
+        return owner if isinstance(owner, set) else (owner,)
+
+    # --- lookups on terms ---
+    def triples(self, pattern):
+        """
+        Yield (s, p, o) terms matching pattern, a 3-tuple of lookup values
+        (CURIE, <iri>, literal text or "literal", _:b) or wildcards (None, "?").
+        """
+        ids = self.resolve_ids(pattern)
+        if ids is None:
+            return
+        decode = self.terms.decode
+        for s, p, o in self.triples_ids(*ids):
+            yield decode(s), decode(p), decode(o)
+
+    def count(self, pattern):
+        ids = self.resolve_ids(pattern)
+        return 0 if ids is None else self.count_ids(*ids)
+
+    def patterns_of(self, pattern):
+        # pattern keys ("framework/file_name") asserting any triple that matches
+        ids = self.resolve_ids(pattern)
+        if ids is None:
+            return []
+        graphs = set()
+        for triple in self.triples_ids(*ids):
+            graphs.update(self.graphs_ids(triple))
+        return sorted(self.pattern_key(g) for g in graphs)
+
+    def pattern_key(self, g):
+        # graph id -> "framework/file_name"
+        return unquote(self.terms.decode(g)[len(json_parser.PATTERN_GRAPH_BASE) + 1:-1])
+
+    def __len__(self):
+        return self.size
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Look up triples in the converted graphs.")
+    parser.add_argument("subject", help='subject (CURIE, <iri>, or "?" for any)')
+    parser.add_argument("predicate", help='predicate (CURIE, <iri>, or "?" for any)')
+    parser.add_argument("object", help='object (CURIE, <iri>, literal text, or "?" for any)')
+    parser.add_argument("--input", default=os.path.join(script_dir, "data", "json_data"),
+                        help="folder of .json files, .jsonl shards or .nt/.nq chunks (default data/json_data)")
+    parser.add_argument("--patterns", action="store_true", help="list the patterns asserting the matches instead")
+    args = parser.parse_args()
+
+    store = TripleStore.from_folder(args.input)
+    pattern = (args.subject, args.predicate, args.object)
+    if args.patterns:
+        for key in store.patterns_of(pattern):
+            print(key)
+    else:
+        for s, p, o in store.triples(pattern):
+            print(store.curie(s), store.curie(p), store.curie(o))
+    print(f"{store.count(pattern)} of {len(store)} triples match", file=sys.stderr)
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+turtle_reader.py
+Streaming Turtle reader for the files this repo writes (json-parser.py,
+unified_graph.py) and hand-written ones like shapes/agento-shapes.ttl.
+
+Behavior:
+- A hand-written regex tokenizer reads the file in blocks cut at line ends,
+  so memory stays flat however large unified.ttl grows; only a multi-line
+  \"\"\"long string\"\"\" may carry over into the next block.
+- A small state machine turns tokens into (s, p, o) triples, yielded one at
+  a time, in the N-Triples term form triple_store uses (<iri>, "literal",
+  "literal"@lang, "literal"^^<datatype>, _:b).
+- Supports @prefix/PREFIX, @base/BASE, 'a', ';' and ',' lists, '[ ]' blank
+  node property lists, strings (short and long), numbers and booleans.
+  Collections '( )' are not supported.
+
+    reader = TurtleReader(f)
+    for s, p, o in reader: ...
+    reader.prefixes  # filled as the @prefix lines stream by
+
+Run from the repository root to count a file's triples:
+    py turtle_reader.py data/ttl_data/unified.ttl
+"""
+
+import argparse
+import re
+import sys
+import time
+from json.encoder import encode_basestring
+
+READ_SIZE = 1 << 16
+XSD = "http://www.w3.org/2001/XMLSchema#"
+XSD_STRING = f"<{XSD}string>"
+RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+
+
+class TurtleError(ValueError):
+    pass
+
+
+STRING_ESCAPES = {"t": "\t", "n": "\n", "r": "\r", "b": "\b", "f": "\f", '"': '"', "'": "'", "\\": "\\"}
+
+
+def unescape_escape(m):
+    esc = m.group(1)
+    if esc[0] in "uU" and len(esc) > 1:
+        return chr(int(esc[1:], 16))
+    return STRING_ESCAPES.get(esc, esc)
+
+
+def unescape_string(text):
+    # quoted string (or <iri>) -> its text, with \-escapes and \uXXXX resolved
+    return re.sub(r"\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)", unescape_escape, text[1:-1])
+
+
+# -------------------------
+# Tokenizer
+# -------------------------
+TOKEN = re.compile(r'''
+    (?:\s+|\#[^\n]*(?![^\n]))*
+    (?:
+        (?P<pname>(?:[A-Za-z][\w-]*(?:\.[\w-]+)*)?:(?:(?:[\w%:-]|\\.)(?:(?:[\w.%:-]|\\.)*(?:[\w%:-]|\\.))?)?)
+      | (?P<punct>[;,.\[\]])
+      | (?P<string>(?!""")"(?:[^"\\\n]|\\.)*"|(?!\'\'\')'(?:[^'\\\n]|\\.)*')
+      | (?P<iri><[^<>"{}|^`\\\s]*>)
+      | (?P<long>"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^'\\]|\\.|'(?!''))*\'\'\')
+      | (?P<at>@[A-Za-z]+(?:-[A-Za-z0-9]+)*)
+      | (?P<dt>\^\^)
+      | (?P<number>[+-]?(?:\d*\.\d+(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+|\d+))
+      | (?P<bnode>_:[A-Za-z0-9_](?:[\w.-]*[\w-])?)
+      | (?P<word>[A-Za-z]+)
+    )
+''', re.X)
+SPACE = re.compile(r'(?:\s+|\#[^\n]*(?![^\n]))*')
+
+
+class Tokenizer:
+    """
+    Iterates (kind, text) tokens of a text stream. line is the line the
+    current block starts at, for error messages.
+    """
+
+    def __init__(self, f, read_size=READ_SIZE):
+        self.f = f
+        self.read_size = read_size
+        self.line = 1
+
+    def __iter__(self):
+        match = TOKEN.match
+        pending = ""
+        eof = False
+        while not eof:
+            block = self.f.read(self.read_size)
+            eof = not block
+            text = pending + block
+            # tokenize up to the last complete line; only long strings span lines
+            cut = len(text) if eof else text.rfind("\n") + 1
+            if not cut:
+                pending = text
+                continue
+            pos = 0
+            while True:
+                m = match(text, pos, cut)
+                if m is None:
+                    pos = SPACE.match(text, pos, cut).end()
+                    if pos == cut:
+                        break
+                    if not eof and text.startswith(('"""', "'''"), pos):
+                        # a long string continues in the next block
+                        break
+                    line = self.line + text.count("\n", 0, pos)
+                    raise TurtleError(f"line {line}: unexpected {text[pos:pos + 20]!r}")
+                pos = m.end()
+                yield m.lastgroup, m.group(m.lastgroup)
+            self.line += text.count("\n", 0, pos)
+            pending = text[pos:]
+        if pending.strip():
+            raise TurtleError(f"line {self.line}: unterminated {pending[:20]!r}")
+
+
+# -------------------------
+# Reader
+# -------------------------
+SUBJECT, PREDICATE, OBJECT, AFTER_OBJECT, AFTER_SUBJECT_NODE, LITERAL, DATATYPE, PREFIX_NAME, PREFIX_IRI, \
+    BASE_IRI, DIRECTIVE_END = range(11)
+
+
+class TurtleReader:
+    """
+    Iterate a Turtle text stream as (s, p, o) N-Triples terms. prefixes holds
+    the declarations seen so far (all of them once iteration finishes).
+    """
+
+    def __init__(self, f, base=""):
+        self.tokens = Tokenizer(f)
+        self.prefixes = {}
+        self.base = base
+        self.bnodes = 0
+        # pname -> <iri>; cleared whenever a prefix is (re)declared
+        self.expanded = {}
+
+    def error(self, message):
+        raise TurtleError(f"near line {self.tokens.line}: {message}")
+
+    def iri(self, kind, text):
+        if kind == "pname":
+            term = self.expanded.get(text)
+            if term is not None:
+                return term
+            prefix, _, local = text.partition(":")
+            uri = self.prefixes.get(prefix)
+            if uri is None:
+                self.error(f"undeclared prefix {prefix!r}")
+            if "\\" in local:
+                local = re.sub(r"\\(.)", r"\1", local)
+            term = self.expanded[text] = f"<{uri}{local}>"
+            return term
+        if kind == "iri":
+            iri = unescape_string(text) if "\\" in text else text[1:-1]
+            return f"<{iri}>" if ":" in iri else f"<{self.base}{iri}>"
+        self.error(f"expected an IRI, found {text!r}")
+
+    def blank_node(self):
+        self.bnodes += 1
+        return f"_:b{self.bnodes}"
+
+    def __iter__(self):
+        state = SUBJECT
+        # (subject, predicate) to return to when a '[' closes; predicate None for a '[' subject
+        stack = []
+        subject = predicate = literal = None
+        sparql_directive = False
+        iri = self.iri
+
+        for kind, text in self.tokens:
+            if state == LITERAL:
+                if kind == "at":
+                    yield subject, predicate, literal + text.lower()
+                    state = AFTER_OBJECT
+                    continue
+                if kind == "dt":
+                    state = DATATYPE
+                    continue
+                yield subject, predicate, literal
+                state = AFTER_OBJECT
+
+            if state == AFTER_OBJECT:
+                if text == ";":
+                    state = PREDICATE
+                elif text == ",":
+                    state = OBJECT
+                elif text == "." and not stack:
+                    state = SUBJECT
+                elif text == "]" and stack:
+                    node = subject
+                    subject, predicate = stack.pop()
+                    if predicate is None:
+                        subject = node
+                        state = AFTER_SUBJECT_NODE
+                else:
+                    self.error(f"unexpected {text!r} after an object")
+
+            elif state == OBJECT:
+                if kind == "string" or kind == "long":
+                    quote = 3 if kind == "long" else 1
+                    body = text[quote:-quote]
+                    if "\\" in body:
+                        body = unescape_string(f'"{body}"')
+                    # same text as json.dumps(body, ensure_ascii=False), the N-Triples form json_parser writes
+                    literal = encode_basestring(body)
+                    state = LITERAL
+                elif text == "[":
+                    node = self.blank_node()
+                    yield subject, predicate, node
+                    stack.append((subject, predicate))
+                    subject = node
+                    state = PREDICATE
+                elif kind == "bnode":
+                    yield subject, predicate, text
+                    state = AFTER_OBJECT
+                elif kind == "number":
+                    datatype = "double" if "e" in text or "E" in text else "decimal" if "." in text else "integer"
+                    yield subject, predicate, f'"{text}"^^<{XSD}{datatype}>'
+                    state = AFTER_OBJECT
+                elif kind == "word" and text in ("true", "false"):
+                    yield subject, predicate, f'"{text}"^^<{XSD}boolean>'
+                    state = AFTER_OBJECT
+                else:
+                    yield subject, predicate, iri(kind, text)
+                    state = AFTER_OBJECT
+
+            elif state == PREDICATE:
+                if text == ";":
+                    continue
+                if text == "." and not stack:
+                    state = SUBJECT
+                elif text == "]" and stack:
+                    node = subject
+                    subject, predicate = stack.pop()
+                    if predicate is None:
+                        subject = node
+                        state = AFTER_SUBJECT_NODE
+                    else:
+                        state = AFTER_OBJECT
+                else:
+                    predicate = RDF_TYPE if kind == "word" and text == "a" else iri(kind, text)
+                    state = OBJECT
+
+            elif state == SUBJECT:
+                if kind == "at" or kind == "word" and text.upper() in ("PREFIX", "BASE"):
+                    directive = text.lstrip("@").lower()
+                    sparql_directive = kind == "word"
+                    if directive == "prefix":
+                        state = PREFIX_NAME
+                    elif directive == "base":
+                        state = BASE_IRI
+                    else:
+                        self.error(f"unknown directive {text!r}")
+                elif text == "[":
+                    stack.append((None, None))
+                    subject = self.blank_node()
+                    state = PREDICATE
+                elif kind == "bnode":
+                    subject = text
+                    state = PREDICATE
+                else:
+                    subject = iri(kind, text)
+                    state = PREDICATE
+
+            elif state == AFTER_SUBJECT_NODE:
+                # "[ ... ] ." or "[ ... ] p o ."
+                if text == "." and not stack:
+                    state = SUBJECT
+                else:
+                    predicate = RDF_TYPE if kind == "word" and text == "a" else iri(kind, text)
+                    state = OBJECT
+
+            elif state == DATATYPE:
+                datatype = iri(kind, text)
+                yield subject, predicate, literal if datatype == XSD_STRING else f"{literal}^^{datatype}"
+                state = AFTER_OBJECT
+
+            elif state == PREFIX_NAME:
+                if kind != "pname" or not text.endswith(":"):
+                    self.error(f"expected a prefix name, found {text!r}")
+                prefix = text[:-1]
+                state = PREFIX_IRI
+
+            elif state == PREFIX_IRI:
+                self.prefixes[prefix] = iri(kind, text)[1:-1]
+                self.expanded.clear()
+                state = SUBJECT if sparql_directive else DIRECTIVE_END
+
+            elif state == BASE_IRI:
+                self.base = iri(kind, text)[1:-1]
+                state = SUBJECT if sparql_directive else DIRECTIVE_END
+
+            elif state == DIRECTIVE_END:
+                if text != ".":
+                    self.error(f"expected '.' after a directive, found {text!r}")
+                state = SUBJECT
+
+        if state == LITERAL:
+            self.error("statement not terminated with '.'")
+        if state != SUBJECT or stack:
+            self.error("unexpected end of input")
+
+
+def read_turtle(path):
+    """
+    (triples, prefixes) of a Turtle file, the triples as a list.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        reader = TurtleReader(f)
+        return list(reader), reader.prefixes
+
+
+def iter_turtle(path):
+    # stream the triples of a Turtle file
+    with open(path, "r", encoding="utf-8") as f:
+        yield from TurtleReader(f)
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read Turtle files and count their triples.")
+    parser.add_argument("paths", nargs="+", help="Turtle files")
+    args = parser.parse_args()
+
+    total = 0
+    start = time.perf_counter()
+    for path in args.paths:
+        try:
+            count = sum(1 for _ in iter_turtle(path))
+        except (OSError, TurtleError) as e:
+            sys.exit(f"[ERROR] {path}: {e}")
+        total += count
+        print(f"{path}: {count} triples")
+    elapsed = time.perf_counter() - start
+    print(f"Read {total} triples from {len(args.paths)} file(s) in {elapsed:.3f}s")
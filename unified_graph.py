@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+unified_graph.py
+Merge every per-pattern graph into data/ttl_data/unified.ttl.
+
+Behavior:
+- Streams the per-pattern prefixes/resources documents (pretty .json files or
+  .jsonl shards) one at a time, sorted so the merged file is deterministic.
+- Groups predicate lists per subject across patterns and drops duplicate triples.
+- Detects conflicting subjects: the same IRI minted by several patterns with
+  different predicate/object sets (e.g. ex:assistant in most AutoGen patterns).
+  Each subject keeps a hash index of its property-set variants, keyed on a
+  fixed-size digest of the sorted pairs, so the check is one dict lookup per
+  subject per file and the pairs themselves are only held once, in the merge.
+- Writes the merged graph with json-parser's TurtleWriter.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+from jsonl_shards import iter_pattern_documents
+from pipeline import json_parser
+
+MergeResult = namedtuple("MergeResult", ["prefixes", "subjects", "conflicts", "stats"])
+
+
+def variant_digest(properties):
+    # a subject's property set -> 16-byte key (predicates are unique, so sort by them)
+    pairs = sorted(properties.items(), key=lambda pair: pair[0])
+    return hashlib.blake2b(json.dumps(pairs, ensure_ascii=False).encode("utf-8"), digest_size=16).digest()
+
+
+def merge_patterns(patterns):
+    """
+    patterns: iterable of (pattern_key, {"prefixes": ..., "resources": ...}).
+    Returns a MergeResult:
+    - prefixes: first binding wins for every prefix
+    - subjects: {subject: {predicate: [object, ...]}}, duplicates dropped,
+      predicates in first-seen order
+    - conflicts: {subject: [[pattern_key, ...] per distinct property set]}
+    - stats: counters for the summary line
+    """
+    prefixes = {}
+    subjects = {}
+    variants = {}
+    stats = {"patterns": 0, "triples_in": 0, "triples_out": 0, "duplicates": 0, "prefix_clashes": 0}
+
+    for key, data in patterns:
+        stats["patterns"] += 1
+        for prefix, uri in (data.get("prefixes") or {}).items():
+            bound = prefixes.setdefault(prefix, uri)
+            if bound != uri:
+                stats["prefix_clashes"] += 1
+                print(f"[WARN] {key}: prefix '{prefix}:' is bound to <{uri}>, keeping <{bound}>")
+
+        for subject, properties in (data.get("resources") or {}).items():
+            stats["triples_in"] += len(properties)
+
+            # hash index of the property sets each pattern gave this subject
+            by_variant = variants.setdefault(subject, {})
+            by_variant.setdefault(variant_digest(properties), []).append(key)
+
+            merged = subjects.setdefault(subject, {})
+            for predicate, obj in properties.items():
+                objects = merged.setdefault(predicate, [])
+                if obj in objects:
+                    stats["duplicates"] += 1
+                    continue
+                objects.append(obj)
+                stats["triples_out"] += 1
+
+    conflicts = {s: list(v.values()) for s, v in variants.items() if len(v) > 1}
+    return MergeResult(prefixes, subjects, conflicts, stats)
+
+
+def write_unified(result, out):
+    writer = json_parser.TurtleWriter(out)
+    writer.prefixes(result.prefixes)
+    writer.banner("Resources")
+    for subject, predicates in result.subjects.items():
+        writer.subject(subject, ((p, o) for p, objects in predicates.items() for o in objects))
+
+
+def report_conflicts(conflicts, limit=5):
+    for subject, groups in conflicts.items():
+        n_patterns = sum(len(g) for g in groups)
+        owners = ", ".join(g[0] for g in groups[:limit])
+        more = f", ... (+{len(groups) - limit})" if len(groups) > limit else ""
+        print(f"[CONFLICT] {subject}: {len(groups)} variants across {n_patterns} patterns ({owners}{more})")
+
+
+def merge_folder(input_root, output_path, quiet=False):
+    # one pattern in memory at a time, sorted so merges don't depend on directory order
+    result = merge_patterns(iter_pattern_documents(input_root))
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        write_unified(result, f)
+
+    if not quiet:
+        report_conflicts(result.conflicts)
+    stats = result.stats
+    print(f"Merged {stats['patterns']} patterns -> {output_path}: "
+          f"{stats['triples_out']} triples ({stats['duplicates']} duplicates dropped), "
+          f"{len(result.subjects)} subjects, {len(result.conflicts)} conflicting")
+    return result
+
+
+# -------------------------
+# MAIN ENTRY
+# -------------------------
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Merge per-pattern graphs into one unified Turtle file.")
+    parser.add_argument("--input", default=os.path.join(script_dir, "data", "json_data"),
+                        help="folder of per-pattern .json files or .jsonl shards (default data/json_data)")
+    parser.add_argument("--output", default=os.path.join(script_dir, "data", "ttl_data", "unified.ttl"),
+                        help="unified Turtle file to write (default data/ttl_data/unified.ttl)")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary line")
+    args = parser.parse_args()
+    merge_folder(args.input, args.output, quiet=args.quiet)